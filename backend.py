@@ -1,14 +1,42 @@
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
+import asyncio
 import os
 from pathlib import Path
 from datetime import datetime
+from typing import List
 from dotenv import load_dotenv
+from starlette.background import BackgroundTask
+from config import Config
+from services.http_client import close_async_client, close_client
+from services.cache_services import CacheService, UncachedResult, script_cache_key
+from services.topic_service import topic_canonicalizer
+from services.audio_cache import audio_cache, audio_key
+from services.tts_service import stream_briefing
+from services.synthesizers import get_synthesizer
+from services.single_flight import single_flight
 
 load_dotenv()
 
-app = FastAPI()
+cache_service = CacheService(cache_duration_minutes=Config.CACHE_DURATION_MINUTES)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if Config.CACHE_AUTO_CLEANUP:
+        # Purges expired cache entries off the request path
+        cache_service.start_sweeper(Config.CACHE_SWEEP_INTERVAL_SECONDS)
+    # Keeps audio/ under its byte quota, evicting least recently played files
+    audio_cache.start_evictor(Config.AUDIO_EVICT_INTERVAL_SECONDS)
+    yield
+    await audio_cache.stop_evictor()
+    await cache_service.stop_sweeper()
+    # Release pooled upstream connections on shutdown
+    await close_async_client()
+    close_client()
+
+app = FastAPI(lifespan=lifespan)
 
 # CORS middleware
 app.add_middleware(
@@ -27,22 +55,101 @@ async def root():
 async def health_check():
     return {"status": "healthy", "timestamp": datetime.now().isoformat()}
 
+async def build_broadcast_segments(topics, source_type, cache=None):
+    """Scrape the requested sources and turn them into broadcast script segments"""
+    from utils import generate_broadcast_segments
+    from news_scraper import NewsScraper
+    from reddit_scraper import scrape_reddit_topics
+
+    tasks = {}
+
+    if source_type in ["news", "both"]:
+        print(f"Scraping news for topics: {topics}")
+        news_scraper = NewsScraper(cache=cache)
+        tasks["news"] = news_scraper.scrape_news(topics)
+
+    if source_type in ["reddit", "both"]:
+        print(f"Scraping Reddit for topics: {topics}")
+        tasks["reddit"] = scrape_reddit_topics(topics, cache=cache)
+
+    # News and Reddit are fetched at the same time
+    results = dict(zip(tasks.keys(), await asyncio.gather(*tasks.values())))
+
+    news_data = results.get("news", {})
+    reddit_data = results.get("reddit", {})
+
+    print("Generating broadcast script...")
+    segments = generate_broadcast_segments(
+        news_data=news_data,
+        reddit_data=reddit_data,
+        topics=topics
+    )
+
+    summaries = list(news_data.get("news_analysis", {}).values())
+    summaries += list(reddit_data.get("reddit_analysis", {}).values())
+    if cache is not None and any(summary.startswith(("Error", "No recent news found")) for summary in summaries):
+        # Don't pin a script built from failed fetches until the TTL runs out
+        raise UncachedResult(segments)
+    return segments
+
+async def get_broadcast_segments(topics, source_type, language):
+    """Build the broadcast script segments, or reuse cached ones"""
+    cache = cache_service if Config.ENABLE_CACHE else None
+    if cache is None:
+        return await build_broadcast_segments(topics, source_type)
+
+    # A repeat briefing is served from the cached script without any upstream calls
+    script_key = script_cache_key(topics, source_type, language)
+    return await cache.get_or_refresh(
+        script_key, lambda: build_broadcast_segments(topics, source_type, cache)
+    )
+
+def audio_url(path) -> str:
+    """Stable URL of a cached MP3: its name is a hash of everything that went into it"""
+    return f"/audio/{Path(path).stem}"
+
+def stream_audio_response(segments: List[str], language: str, engine: str):
+    """Send MP3 frames segment by segment as they are synthesized, instead of after the whole script"""
+    if language not in Config.SUPPORTED_LANGUAGES:
+        language = 'en'
+
+    script = " ".join(segments)
+    cached_path = audio_cache.cached(script, language, engine=engine)
+    if cached_path:
+        return FileResponse(path=cached_path, media_type="audio/mpeg", filename="news-summary.mp3",
+                            headers={"Content-Location": audio_url(cached_path)})
+
+    # Each streamed segment, and then the whole briefing, lands in the audio cache
+    print("Streaming audio...")
+    return StreamingResponse(
+        stream_briefing(segments, language, engine=engine, script=script),
+        media_type="audio/mpeg",
+        headers={"Content-Disposition": 'attachment; filename="news-summary.mp3"'}
+    )
+
 @app.post("/generate-news-audio")
 async def generate_news_audio(request: dict):
     try:
         topics = request.get("topics", [])
         source_type = request.get("source_type", "both")
         language = request.get("language", "en")
+        engine = request.get("engine") or Config.TTS_ENGINE
         
+        # "AI", "Artificial Intelligence" and " ai " all share one set of fetches and cache keys
+        topics = topic_canonicalizer.canonicalize_topics(topics)
+
         # Validate input
         if not topics:
             raise HTTPException(status_code=400, detail="No topics provided")
+        try:
+            # Engine names are case-insensitive, in requests and in TTS_ENGINE
+            engine = get_synthesizer(engine).name
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
         # Import your existing modules
         from models import NewsRequest
-        from utils import generate_broadcast_news, tts_to_audio
-        from news_scraper import NewsScraper
-        from reddit_scraper import scrape_reddit_topics
+        from utils import tts_to_audio, tts_to_bytes
         
         # Create NewsRequest object
         news_request = NewsRequest(
@@ -51,44 +158,104 @@ async def generate_news_audio(request: dict):
             language=language
         )
         
-        results = {}
-        
-        if source_type in ["news", "both"]:
-            print(f"Scraping news for topics: {topics}")
-            news_scraper = NewsScraper()
-            results["news"] = await news_scraper.scrape_news(topics)
-        
-        if source_type in ["reddit", "both"]:
-            print(f"Scraping Reddit for topics: {topics}")
-            results["reddit"] = await scrape_reddit_topics(topics)
+        segments = await get_broadcast_segments(topics, source_type, language)
+        news_summary = " ".join(segments)
 
-        news_data = results.get("news", {})
-        reddit_data = results.get("reddit", {})
-        
-        print("Generating broadcast script...")
-        news_summary = generate_broadcast_news(
-            api_key=None,
-            news_data=news_data,
-            reddit_data=reddit_data,
-            topics=topics
-        )
+        if request.get("stream"):
+            return stream_audio_response(segments, language, engine)
 
         print("Converting to audio...")
-        audio_path = tts_to_audio(text=news_summary, language=language)
+        if Config.AUDIO_RESPONSE_MODE == "memory":
+            # Serve straight from the buffer; writing to audio/ happens after the response is sent.
+            # Identical concurrent requests share one synthesis, like the per-file lock in file mode
+            flight = f"tts:{audio_key(news_summary, language, engine=engine)}"
+            audio, persist, audio_path = await single_flight.do(flight, lambda: asyncio.to_thread(
+                tts_to_bytes, text=news_summary, language=language, segments=segments, engine=engine
+            ))
+            if audio_path:
+                # Already cached: send the file rather than a copy in memory
+                return FileResponse(
+                    path=audio_path,
+                    media_type="audio/mpeg",
+                    filename="news-summary.mp3",
+                    headers={"Content-Location": audio_url(audio_path)}
+                )
+            if not audio:
+                raise HTTPException(status_code=500, detail="Failed to generate audio")
+            return Response(
+                content=audio,
+                media_type="audio/mpeg",
+                headers={"Content-Disposition": 'attachment; filename="news-summary.mp3"'},
+                background=BackgroundTask(persist) if Config.AUDIO_PERSIST else None
+            )
+
+        # gTTS is blocking, keep it off the event loop; unchanged segments come from the audio cache
+        audio_path = await asyncio.to_thread(
+            tts_to_audio, text=news_summary, language=language, segments=segments, engine=engine
+        )
 
         if audio_path and Path(audio_path).exists():
             return FileResponse(
                 path=audio_path,
                 media_type="audio/mpeg",
-                filename="news-summary.mp3"
+                filename="news-summary.mp3",
+                headers={"Content-Location": audio_url(audio_path)}
             )
         else:
             raise HTTPException(status_code=500, detail="Failed to generate audio file")
     
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/generate-news-audio/stream")
+async def stream_news_audio(topics: List[str] = Query(...), source_type: str = "both", language: str = "en",
+                            engine: str = None):
+    """Streaming variant usable directly as an <audio> source"""
+    return await generate_news_audio({
+        "topics": topics,
+        "source_type": source_type,
+        "language": language,
+        "engine": engine,
+        "stream": True
+    })
+
+@app.api_route("/audio/{audio_id}", methods=["GET", "HEAD"])
+async def get_audio(audio_id: str, request: Request):
+    """Serve a synthesized MP3 by its content hash, cacheable by browsers and proxies
+
+    Supports conditional requests (304) and byte ranges (206) so players can
+    seek without downloading the whole briefing again.
+    """
+    audio_path = await asyncio.to_thread(audio_cache.resolve, audio_id)
+    try:
+        stat = os.stat(audio_path) if audio_path else None
+    except OSError:
+        stat = None
+    if stat is None:
+        raise HTTPException(status_code=404, detail="Audio not found")
+
+    # Strong validator: changes if the file is ever re-synthesized with different bytes,
+    # so the response isn't immutable and clients revalidate once max-age passes
+    etag = f'"{audio_id}-{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={Config.AUDIO_HTTP_MAX_AGE}",
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        # If-None-Match uses weak comparison, so W/ prefixes are ignored
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        if "*" in tags or etag in tags:
+            return Response(status_code=304, headers=headers)
+
+    # FileResponse answers Range/If-Range with 206 and keeps the ETag given here
+    return FileResponse(path=audio_path, media_type="audio/mpeg", filename="news-summary.mp3",
+                        content_disposition_type="inline", headers=headers, stat_result=stat)
+
 @app.get("/trending")
 async def get_trending_topics():
     """Get trending topics"""
@@ -99,12 +266,18 @@ async def get_trending_topics():
 @app.get("/stats")
 async def get_stats():
     """Get API usage statistics"""
-    audio_dir = Path("audio")
-    audio_files = len(list(audio_dir.glob("*.mp3"))) if audio_dir.exists() else 0
+    # Aggregated from the shared audio index, so polling /stats never walks the directory
+    audio_stats = await asyncio.to_thread(audio_cache.get_stats)
+    cache_stats = cache_service.stats()
     
     return {
-        "cache_size": 0,
-        "audio_files": audio_files,
+        "cache_size": cache_stats["entries"],
+        "cache_hit_ratio": cache_stats["hit_ratio"],
+        "cache_bytes": cache_stats["resident_bytes"],
+        "cache": cache_stats,
+        "topics": topic_canonicalizer.get_stats(),
+        "audio_files": audio_stats["total_files"],
+        "audio": audio_stats,
         "supported_languages": ["en", "es", "fr", "de", "it", "pt", "hi", "ja", "ko"]
     }
 
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark the streaming RSS item parser against feedparser.
+
+Usage:
+    python benchmarks/bench_feed_parser.py                 # synthetic 100-item feed
+    python benchmarks/bench_feed_parser.py saved_feed.xml  # a real Google News download
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import feedparser
+from services.feed_service import parse_rss_items
+
+
+def make_google_news_feed(items: int = 100) -> bytes:
+    """Build a feed shaped like a Google News search result"""
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>',
+        '<rss version="2.0" xmlns:media="http://search.yahoo.com/mrss/"><channel>',
+        '<generator>NFE/5.0</generator><title>"artificial intelligence" - Google News</title>',
+        '<link>https://news.google.com/search?q=artificial+intelligence</link>',
+        '<language>en-US</language><description>Google News</description>',
+    ]
+    for i in range(items):
+        link = f"https://news.google.com/rss/articles/CBMi{'x' * 180}{i}?oc=5"
+        parts.append(
+            "<item>"
+            f"<title>Story {i} about AI &amp; the economy: what&#39;s next - Publisher {i % 7}</title>"
+            f"<link>{link}</link>"
+            f'<guid isPermaLink="false">CBMi{"y" * 180}{i}</guid>'
+            f"<pubDate>Mon, 0{i % 9 + 1} Jun 2025 1{i % 10}:00:00 GMT</pubDate>"
+            f"<description>&lt;a href=&quot;{link}&quot; target=&quot;_blank&quot;&gt;Story {i} about AI"
+            f"&lt;/a&gt;&amp;nbsp;&amp;nbsp;&lt;font color=&quot;#6f6f6f&quot;&gt;Publisher {i % 7}&lt;/font&gt;"
+            "</description>"
+            f'<source url="https://publisher{i % 7}.example.com">Publisher {i % 7}</source>'
+            "</item>"
+        )
+    parts.append("</channel></rss>")
+    return "".join(parts).encode("utf-8")
+
+
+def main():
+    if len(sys.argv) > 1:
+        content = Path(sys.argv[1]).read_bytes()
+    else:
+        content = make_google_news_feed()
+
+    total_items = len(feedparser.parse(content).entries)
+    print(f"Feed: {len(content) / 1024:.1f} KiB, {total_items} items")
+
+    runs = 50
+    baseline = timeit.timeit(lambda: feedparser.parse(content).entries[:10], number=runs) / runs
+    print(f"{'feedparser (full feed)':<28} {baseline * 1000:8.2f} ms")
+
+    for limit in (8, 10, None):
+        elapsed = timeit.timeit(lambda: parse_rss_items(content, limit), number=runs) / runs
+        label = f"streaming (limit={limit})"
+        print(f"{label:<28} {elapsed * 1000:8.2f} ms  ({baseline / elapsed:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
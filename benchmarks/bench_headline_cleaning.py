@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of per-headline cleaning cost.
+
+Compares one BeautifulSoup tree per headline (the old NewsService path), the
+regex used by the Streamlit apps, and the batched normalize_headlines().
+
+Usage:
+    python benchmarks/bench_headline_cleaning.py
+"""
+
+import re
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bs4 import BeautifulSoup
+from services.feed_service import normalize_headlines
+
+
+def make_entries(count: int = 100, markup_every: int = 10):
+    """Google News style titles; a few carry entities or markup"""
+    entries = []
+    for i in range(count):
+        publisher = f"Publisher {i % 7}"
+        title = f"Story {i} about AI and the economy: what comes next - {publisher}"
+        if i % markup_every == 0:
+            title = f"Story {i} about <b>AI</b> &amp; the economy: what&#39;s next - {publisher}"
+        entries.append({"title": title, "source": publisher})
+    return entries
+
+
+def main():
+    entries = make_entries()
+    count = len(entries)
+    runs = 200
+
+    candidates = {
+        "BeautifulSoup per headline": lambda: [
+            BeautifulSoup(e["title"], "html.parser").get_text() for e in entries
+        ],
+        "regex per headline": lambda: [re.sub(r"<[^>]+>", "", e["title"]) for e in entries],
+        "normalize_headlines (batch)": lambda: normalize_headlines(entries),
+    }
+
+    print(f"{count} headlines, {runs} runs each")
+    for label, func in candidates.items():
+        elapsed = timeit.timeit(func, number=runs) / runs
+        print(f"{label:<30} {elapsed / count * 1e6:8.2f} us/headline")
+
+
+if __name__ == "__main__":
+    main()
@@ -25,29 +25,97 @@ class Config:
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
     NEWS_API_KEY = os.getenv("NEWS_API_KEY", "")
     
+    # =============================================================================
+    # UPSTREAM ENDPOINTS (point these at replay_server.py for offline runs)
+    # =============================================================================
+    GOOGLE_NEWS_RSS_URL = os.getenv("GOOGLE_NEWS_RSS_URL", "https://news.google.com/rss/search")
+    REDDIT_SEARCH_URL = os.getenv("REDDIT_SEARCH_URL", "https://www.reddit.com/search.json")
+    HUGGINGFACE_API_URL = os.getenv(
+        "HUGGINGFACE_API_URL", "https://api-inference.huggingface.co/models/facebook/bart-large-cnn"
+    )
+    GROQ_BASE_URL = os.getenv("GROQ_BASE_URL", "https://api.groq.com")
+    
     # =============================================================================
     # CACHE SETTINGS
     # =============================================================================
-    CACHE_DURATION_MINUTES = int(os.getenv("CACHE_DURATION_MINUTES", "30"))
-    CACHE_FILE_PATH = os.getenv("CACHE_FILE_PATH", "cache.json")
+    CACHE_DURATION_MINUTES = int(os.getenv("CACHE_DURATION_MINUTES", "30"))  # soft TTL
+    # Stale entries are served while refreshing in the background until this age
+    CACHE_HARD_TTL_MINUTES = int(os.getenv("CACHE_HARD_TTL_MINUTES", "120"))
+    CACHE_FILE_PATH = os.getenv("CACHE_FILE_PATH", "cache.json")  # legacy, imported once
+    CACHE_DB_PATH = os.getenv("CACHE_DB_PATH", "cache.db")
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1000"))
+    CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    # How long a worker trusts its in-memory copy before re-reading the shared store
+    CACHE_L1_TTL_SECONDS = float(os.getenv("CACHE_L1_TTL_SECONDS", "30"))
     CACHE_AUTO_CLEANUP = os.getenv("CACHE_AUTO_CLEANUP", "true").lower() == "true"
+    CACHE_SWEEP_INTERVAL_SECONDS = float(os.getenv("CACHE_SWEEP_INTERVAL_SECONDS", "60"))
+    # Value encoding: "auto" picks msgpack / zstd when installed, else compact JSON / zlib
+    CACHE_SERIALIZER = os.getenv("CACHE_SERIALIZER", "auto")  # auto, msgpack or json
+    CACHE_COMPRESSION = os.getenv("CACHE_COMPRESSION", "auto")  # auto, zstd, zlib or none
+    CACHE_COMPRESS_MIN_BYTES = int(os.getenv("CACHE_COMPRESS_MIN_BYTES", "1024"))
     
     # =============================================================================
     # AUDIO SETTINGS
     # =============================================================================
     AUDIO_OUTPUT_DIR = Path(os.getenv("AUDIO_OUTPUT_DIR", "audio"))
     DEFAULT_TTS_LANGUAGE = os.getenv("DEFAULT_TTS_LANGUAGE", "en")
-    AUDIO_CLEANUP_DAYS = int(os.getenv("AUDIO_CLEANUP_DAYS", "1"))
+    AUDIO_CLEANUP_DAYS = float(os.getenv("AUDIO_CLEANUP_DAYS", "1"))  # idle files are evicted after this; 0 disables
+    AUDIO_MAX_BYTES = int(os.getenv("AUDIO_MAX_BYTES", str(512 * 1024 * 1024)))  # LRU eviction beyond this
+    AUDIO_EVICT_INTERVAL_SECONDS = float(os.getenv("AUDIO_EVICT_INTERVAL_SECONDS", "300"))
+    # Audio stats come from the audio index; a directory scan corrects the index this often
+    AUDIO_RECONCILE_INTERVAL_SECONDS = float(os.getenv("AUDIO_RECONCILE_INTERVAL_SECONDS", "3600"))
+    # "memory": serve synthesized audio from a buffer; "file": write it to audio/ first and send the file
+    AUDIO_RESPONSE_MODE = os.getenv("AUDIO_RESPONSE_MODE", "memory").lower()
+    # In memory mode, save new audio to audio/ after the response is sent (false: never touch the disk)
+    AUDIO_PERSIST = os.getenv("AUDIO_PERSIST", "true").lower() == "true"
+    # Browser/proxy cache lifetime of /audio/<id>. The URL hashes the script, but a file
+    # re-synthesized after eviction may differ byte for byte, so clients revalidate (304) after this
+    AUDIO_HTTP_MAX_AGE = int(os.getenv("AUDIO_HTTP_MAX_AGE", str(24 * 3600)))
     MAX_AUDIO_LENGTH = int(os.getenv("MAX_AUDIO_LENGTH", "5000"))
+    # Long scripts are split at sentence boundaries and synthesized in parallel
+    TTS_CHUNK_CHARS = int(os.getenv("TTS_CHUNK_CHARS", "1000"))
+    TTS_MAX_WORKERS = int(os.getenv("TTS_MAX_WORKERS", "4"))
+    # "gtts" (network) or "local" (espeak-ng/pyttsx3 + lame/ffmpeg, offline)
+    TTS_ENGINE = os.getenv("TTS_ENGINE", "gtts")
+    # Used when the chosen engine fails (e.g. Google throttling); empty disables failover
+    TTS_FALLBACK_ENGINE = os.getenv("TTS_FALLBACK_ENGINE", "local")
+    # Streamed responses start with a short chunk to cut time-to-first-audio
+    TTS_FIRST_CHUNK_CHARS = int(os.getenv("TTS_FIRST_CHUNK_CHARS", "200"))
     
     # =============================================================================
     # REQUEST SETTINGS
     # =============================================================================
     REQUEST_TIMEOUT = int(os.getenv("REQUEST_TIMEOUT", "30"))
+    HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+    HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+    HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+    HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "false").lower() == "true"
+    
+    # "streaming" stops after the first N <item>s, "feedparser" parses the whole feed
+    FEED_PARSER = os.getenv("FEED_PARSER", "streaming")
     MAX_TOPICS_PER_REQUEST = int(os.getenv("MAX_TOPICS_PER_REQUEST", "5"))
     RATE_LIMIT_DELAY = int(os.getenv("RATE_LIMIT_DELAY", "2"))
     USER_AGENT = os.getenv("USER_AGENT", "NewsNinja/2.0 (Educational Use)")
     
+    # Per-host token buckets as "host=requests_per_second:burst" pairs.
+    # A host also matches its subdomains (reddit.com covers www.reddit.com).
+    # Requests under GOOGLE_NEWS_RSS_URL, REDDIT_SEARCH_URL, HUGGINGFACE_API_URL and
+    # GROQ_BASE_URL use the rule of the real host they stand for, even when pointed
+    # at replay_server.py, so each upstream keeps its own bucket.
+    RATE_LIMITS = os.getenv(
+        "RATE_LIMITS",
+        "news.google.com=1:5,reddit.com=0.5:5,huggingface.co=1:5,api.groq.com=0.5:5"
+    )
+    DEFAULT_RATE_LIMIT = os.getenv("DEFAULT_RATE_LIMIT", "2:10")
+    
+    # Topic aliases as "alias=canonical topic" pairs, applied after case/punctuation folding
+    TOPIC_ALIASES = os.getenv(
+        "TOPIC_ALIASES",
+        "ai=artificial intelligence,ml=machine learning,crypto=cryptocurrency,"
+        "evs=electric vehicles,ev=electric vehicles,climate=climate change"
+    )
+    
     # =============================================================================
     # FEATURE FLAGS
     # =============================================================================
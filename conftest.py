@@ -0,0 +1 @@
+# Lets pytest import the top-level modules and the services package from the repo root
@@ -1,34 +1,53 @@
 #news_scraper.py
 import asyncio
 import os
-from typing import Dict, List
+from typing import Dict, List, Optional
 from dotenv import load_dotenv
-from utils import scrape_news_free, summarize_with_free_api
+from utils import scrape_news_free, summarize_with_free_api, NEWS_LOCALE
+from services.single_flight import single_flight, flight_key
+from services.cache_services import CacheService, UncachedResult, cache_key
 
 load_dotenv()
 
 class NewsScraper:
+
+    def __init__(self, cache: Optional[CacheService] = None):
+        self.cache = cache
     
     async def scrape_news(self, topics: List[str]) -> Dict[str, str]:
         """Scrape and analyze news articles using free resources"""
-        results = {}
-        
-        for topic in topics:
-            try:
-                # Get headlines using free RSS
-                headlines = scrape_news_free(topic)
-                
-                if headlines and not headlines.startswith("Error"):
-                    # Summarize using free API or simple processing
-                    summary = summarize_with_free_api(headlines)
-                    results[topic] = summary
-                else:
-                    results[topic] = f"No recent news found for {topic}"
-                    
-                # Add delay to be respectful to free services
-                await asyncio.sleep(2)
-                
-            except Exception as e:
-                results[topic] = f"Error: {str(e)}"
-
-        return {"news_analysis": results}
\ No newline at end of file
+        # Fan out across topics so the request takes as long as the slowest fetch
+        summaries = await asyncio.gather(*(self._scrape_topic(topic) for topic in topics))
+        results = dict(zip(topics, summaries))
+
+        return {"news_analysis": results}
+
+    async def _scrape_topic(self, topic: str) -> str:
+        """Fetch and summarize a single topic, sharing in-flight work for identical topics"""
+        if self.cache is not None:
+            key = cache_key("news", topic, language=NEWS_LOCALE)
+            return await self.cache.get_or_refresh(key, lambda: self._load_topic(topic))
+
+        key = flight_key("news", topic, NEWS_LOCALE)
+        return await single_flight.do(key, lambda: self._fetch_and_summarize(topic))
+
+    async def _load_topic(self, topic: str) -> str:
+        """Cache loader: failed or empty fetches are returned but not cached"""
+        summary = await self._fetch_and_summarize(topic)
+        if summary.startswith(("Error", "No recent news found")):
+            raise UncachedResult(summary)
+        return summary
+
+    async def _fetch_and_summarize(self, topic: str) -> str:
+        """Fetch headlines for a topic and summarize them"""
+        try:
+            # Get headlines using free RSS
+            headlines = await scrape_news_free(topic)
+            
+            if headlines and not headlines.startswith("Error"):
+                # Summarize using free API or simple processing
+                return await summarize_with_free_api(headlines)
+            return f"No recent news found for {topic}"
+            
+        except Exception as e:
+            return f"Error: {str(e)}"
@@ -1,20 +1,25 @@
-from typing import List
+from typing import List, Optional
 import asyncio
-import requests
 import json
 from datetime import datetime, timedelta
+from urllib.parse import quote_plus
+from config import Config
+from services.http_client import fetch_get
+from services.single_flight import single_flight, flight_key
+from services.cache_services import CacheService, UncachedResult, cache_key
+from services.topic_service import canonical_topic
 
-def scrape_reddit_free(topic: str) -> str:
+async def scrape_reddit_free(topic: str) -> str:
     """Scrape Reddit using free public JSON API"""
     try:
         # Reddit allows accessing JSON by adding .json to URLs
-        search_url = f"https://www.reddit.com/search.json?q={topic}&sort=hot&limit=5&t=week"
+        search_url = f"{Config.REDDIT_SEARCH_URL}?q={quote_plus(canonical_topic(topic))}&sort=hot&limit=5&t=week"
         
         headers = {
             'User-Agent': 'NewsNinja/1.0 (Educational Use)'
         }
         
-        response = requests.get(search_url, headers=headers, timeout=10)
+        response = await fetch_get(search_url, headers=headers, timeout=10)
         response.raise_for_status()
         
         data = response.json()
@@ -52,12 +57,24 @@ def scrape_reddit_free(topic: str) -> str:
     except Exception as e:
         return f"Error accessing Reddit data for {topic}: {str(e)}"
 
-async def scrape_reddit_topics(topics: List[str]) -> dict:
+async def _load_reddit_topic(topic: str) -> str:
+    """Cache loader: failed lookups are returned but not cached"""
+    summary = await scrape_reddit_free(topic)
+    if summary.startswith("Error"):
+        raise UncachedResult(summary)
+    return summary
+
+async def _scrape_reddit_topic(topic: str, cache: Optional[CacheService] = None) -> str:
+    """Summarize one topic from the cache, sharing in-flight work for identical topics"""
+    if cache is not None:
+        return await cache.get_or_refresh(cache_key("reddit", topic), lambda: _load_reddit_topic(topic))
+    return await single_flight.do(flight_key("reddit", topic), lambda: scrape_reddit_free(topic))
+
+async def scrape_reddit_topics(topics: List[str], cache: Optional[CacheService] = None) -> dict:
     """Process list of topics and return analysis results"""
-    reddit_results = {}
-    
-    for topic in topics:
-        reddit_results[topic] = scrape_reddit_free(topic)
-        await asyncio.sleep(3)  # Be respectful to Reddit's servers
+    # Fetch all topics concurrently instead of one after another
+    # Concurrent requests for the same topic share one upstream call
+    summaries = await asyncio.gather(*(_scrape_reddit_topic(topic, cache) for topic in topics))
+    reddit_results = dict(zip(topics, summaries))
         
     return {"reddit_analysis": reddit_results}
\ No newline at end of file
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+NewsNinja 2.0 - Record/Replay stand-in for upstream APIs
+
+Serves Google News RSS, Reddit search JSON, Hugging Face inference and Groq
+completions from disk so benchmarks and load tests can run offline.
+
+    # Capture real responses (proxied to the real upstreams)
+    python replay_server.py --mode record
+
+    # Replay them with 80ms +/- 40ms latency, 1% errors and 2% 429s
+    python replay_server.py --mode replay --latency-ms 80 --jitter-ms 40 \\
+        --error-rate 0.01 --throttle-rate 0.02
+
+Then point the app at it, e.g.:
+    GOOGLE_NEWS_RSS_URL=http://localhost:8765/news/rss/search
+    REDDIT_SEARCH_URL=http://localhost:8765/reddit/search.json
+    HUGGINGFACE_API_URL=http://localhost:8765/hf/models/facebook/bart-large-cnn
+    GROQ_BASE_URL=http://localhost:8765/groq
+
+Each upstream keeps its own RATE_LIMITS bucket behind the stand-in. Those
+budgets mirror the real APIs; for load tests that should measure the app
+rather than the client-side limiter, raise them as well:
+    RATE_LIMITS="news.google.com=1000:1000,reddit.com=1000:1000,huggingface.co=1000:1000,api.groq.com=1000:1000"
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+from xml.sax.saxutils import escape
+
+# Path prefix -> real upstream origin
+UPSTREAMS = {
+    "news": "https://news.google.com",
+    "reddit": "https://www.reddit.com",
+    "hf": "https://api-inference.huggingface.co",
+    "groq": "https://api.groq.com",
+}
+
+# Response headers worth replaying
+KEPT_HEADERS = ("content-type", "etag", "last-modified", "cache-control")
+# Request headers forwarded upstream while recording
+FORWARDED_HEADERS = ("user-agent", "content-type", "authorization", "accept")
+
+
+class ReplaySettings:
+    """Runtime options shared by all handler threads"""
+
+    def __init__(self, args):
+        self.mode = args.mode
+        self.recordings = Path(args.recordings)
+        self.latency = args.latency_ms / 1000
+        self.jitter = args.jitter_ms / 1000
+        self.error_rate = args.error_rate
+        self.throttle_rate = args.throttle_rate
+        self.synthetic = args.synthetic
+        self.random = random.Random(args.seed)
+        self.random_lock = threading.Lock()
+        self.stats = {"served": 0, "recorded": 0, "missing": 0, "errors": 0, "throttled": 0}
+
+    def roll(self) -> float:
+        """Seeded random number, safe across handler threads"""
+        with self.random_lock:
+            return self.random.random()
+
+
+def recording_key(method: str, path: str, query: str, body: bytes) -> str:
+    """Stable file key for a request"""
+    digest = hashlib.sha256(f"{method} {path}?{query}\n".encode() + body)
+    return digest.hexdigest()[:32]
+
+
+def synthetic_response(upstream: str, query: dict, body: bytes):
+    """Generate a plausible response when nothing was recorded"""
+    topic = (query.get("q") or ["news"])[0]
+
+    if upstream == "news":
+        now = format_datetime(datetime.now(timezone.utc), usegmt=True)
+        items = "".join(
+            "<item>"
+            f"<title>{escape(topic)} story {i}: latest developments - Publisher {i % 7}</title>"
+            f"<link>https://example.com/{i}</link>"
+            f'<guid isPermaLink="false">{i}</guid>'
+            f"<pubDate>{now}</pubDate>"
+            f'<source url="https://publisher{i % 7}.example.com">Publisher {i % 7}</source>'
+            "</item>"
+            for i in range(100)
+        )
+        content = f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>{items}</channel></rss>'
+        return 200, {"content-type": "application/rss+xml; charset=utf-8"}, content.encode()
+
+    if upstream == "reddit":
+        limit = int((query.get("limit") or ["10"])[0])
+        posts = [
+            {"data": {"title": f"Discussion {i} about {topic}", "score": 40 * (i + 1), "num_comments": 12 * (i + 1)}}
+            for i in range(limit)
+        ]
+        return 200, {"content-type": "application/json"}, json.dumps({"data": {"children": posts}}).encode()
+
+    if upstream == "hf":
+        try:
+            inputs = json.loads(body or b"{}").get("inputs", "")
+        except ValueError:
+            inputs = ""
+        return 200, {"content-type": "application/json"}, json.dumps([{"summary_text": inputs[:200]}]).encode()
+
+    if upstream == "groq":
+        completion = {
+            "id": "replay", "object": "chat.completion", "created": int(time.time()), "model": "replay",
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": f"Replay summary about {topic}."}}],
+        }
+        return 200, {"content-type": "application/json"}, json.dumps(completion).encode()
+
+    return None
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    settings: ReplaySettings = None
+
+    def do_GET(self):
+        self.handle_request()
+
+    def do_POST(self):
+        self.handle_request()
+
+    def log_message(self, format, *args):
+        pass
+
+    def handle_request(self):
+        settings = self.settings
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+
+        parts = urlsplit(self.path)
+        upstream, _, rest = parts.path.lstrip("/").partition("/")
+        if upstream not in UPSTREAMS:
+            return self.send(404, {"content-type": "application/json"}, b'{"error": "unknown upstream"}')
+
+        # Fault injection: latency, then 429s and 5xx at the configured rates
+        delay = settings.latency + settings.jitter * (2 * settings.roll() - 1)
+        if delay > 0:
+            time.sleep(delay)
+        if settings.roll() < settings.throttle_rate:
+            settings.stats["throttled"] += 1
+            return self.send(429, {"content-type": "application/json", "retry-after": "1"}, b'{"error": "throttled"}')
+        if settings.roll() < settings.error_rate:
+            settings.stats["errors"] += 1
+            return self.send(503, {"content-type": "application/json"}, b'{"error": "injected failure"}')
+
+        key = recording_key(self.command, f"/{upstream}/{rest}", parts.query, body)
+        meta_file = settings.recordings / upstream / f"{key}.json"
+        body_file = meta_file.with_suffix(".body")
+
+        if settings.mode == "record":
+            status, headers, content = self.forward(upstream, rest, parts.query, body)
+            if status < 500 and status != 429:
+                meta_file.parent.mkdir(parents=True, exist_ok=True)
+                body_file.write_bytes(content)
+                meta_file.write_text(json.dumps({
+                    "method": self.command,
+                    "url": f"{UPSTREAMS[upstream]}/{rest}?{parts.query}",
+                    "status": status,
+                    "headers": headers,
+                    "recorded_at": datetime.now().isoformat(),
+                }, indent=2))
+                settings.stats["recorded"] += 1
+            return self.send(status, headers, content)
+
+        if meta_file.exists():
+            meta = json.loads(meta_file.read_text())
+            status, headers, content = meta["status"], meta["headers"], body_file.read_bytes()
+        else:
+            generated = synthetic_response(upstream, parse_qs(parts.query), body) if settings.synthetic else None
+            if generated is None:
+                settings.stats["missing"] += 1
+                return self.send(404, {"content-type": "application/json"}, b'{"error": "no recording"}')
+            status, headers, content = generated
+
+        # Honour revalidation so conditional GET paths can be exercised offline
+        etag = headers.get("etag")
+        if etag and self.headers.get("If-None-Match") == etag:
+            return self.send(304, {"etag": etag}, b"")
+
+        settings.stats["served"] += 1
+        return self.send(status, headers, content)
+
+    def forward(self, upstream: str, rest: str, query: str, body: bytes):
+        """Proxy a request to the real upstream (record mode)"""
+        from services.http_client import request
+
+        url = f"{UPSTREAMS[upstream]}/{rest}" + (f"?{query}" if query else "")
+        headers = {name: self.headers[name] for name in FORWARDED_HEADERS if self.headers.get(name)}
+        response = request(self.command, url, headers=headers, content=body or None)
+        kept = {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers}
+        return response.status_code, kept, response.content
+
+    def send(self, status: int, headers: dict, content: bytes):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        if content:
+            self.wfile.write(content)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record/replay stand-in for NewsNinja upstream APIs")
+    parser.add_argument("--mode", choices=["record", "replay"], default="replay")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--recordings", default="recordings", help="directory holding captured responses")
+    parser.add_argument("--latency-ms", type=float, default=0, help="base latency added to every response")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="uniform +/- jitter around the latency")
+    parser.add_argument("--error-rate", type=float, default=0, help="fraction of requests answered with 503")
+    parser.add_argument("--throttle-rate", type=float, default=0, help="fraction of requests answered with 429")
+    parser.add_argument("--synthetic", action="store_true", help="generate responses for unrecorded requests")
+    parser.add_argument("--seed", type=int, default=None, help="seed for reproducible jitter and faults")
+    args = parser.parse_args()
+
+    ReplayHandler.settings = ReplaySettings(args)
+    server = ThreadingHTTPServer((args.host, args.port), ReplayHandler)
+
+    base = f"http://{args.host}:{args.port}"
+    print(f"🎞️  Replay server ({args.mode}) on {base}")
+    print(f"   GOOGLE_NEWS_RSS_URL={base}/news/rss/search")
+    print(f"   REDDIT_SEARCH_URL={base}/reddit/search.json")
+    print(f"   HUGGINGFACE_API_URL={base}/hf/models/facebook/bart-large-cnn")
+    print(f"   GROQ_BASE_URL={base}/groq")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n📊 {ReplayHandler.settings.stats}")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
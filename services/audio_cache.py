@@ -0,0 +1,316 @@
+#enhanced-tts-project\services\audio_cache.py
+import asyncio
+import hashlib
+import os
+import re
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from config import Config
+from services.audio_index import AudioIndex
+
+# Scratch files older than this were left behind by a crashed worker
+_STALE_PARTIAL_SECONDS = 3600
+
+# File names without .mp3, as used in /audio/<id> URLs
+_AUDIO_ID_RE = re.compile(r"tts_[\w-]+_[0-9a-f]{32}")
+
+
+def audio_key(text: str, language: str, tld: str = "com", slow: bool = False, engine: str = "gtts") -> str:
+    """Hash everything that changes the synthesized audio"""
+    normalized = " ".join(text.split())
+    material = f"{language}\x00{tld}\x00{int(slow)}\x00{normalized}"
+    if engine != "gtts":
+        # gTTS keys predate pluggable engines and are kept as they were
+        material += f"\x00{engine}"
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()[:32]
+
+
+class AudioCache:
+    """Content-addressed MP3 store: one file per (script, language, tld, slow, engine)
+
+    Files are named tts_<language>_<hash>.mp3, so names never collide, and are
+    written to a scratch directory first, then moved into place, so a reader
+    never sees a partial file. An SQLite index tracks size and last access;
+    a background task evicts idle files and then least recently used ones
+    once the directory exceeds its byte quota.
+    """
+
+    def __init__(self, audio_dir: Path = Config.AUDIO_OUTPUT_DIR, max_bytes: int = Config.AUDIO_MAX_BYTES,
+                 max_age_days: float = Config.AUDIO_CLEANUP_DAYS):
+        self.audio_dir = Path(audio_dir)
+        self.partial_dir = self.audio_dir / ".partial"
+        self.max_bytes = max_bytes
+        self.max_age = max_age_days * 86400
+        self.index = AudioIndex(self.audio_dir / "index.db")
+        self.lock = threading.Lock()
+        # file name -> [lock, number of threads using it]
+        self.key_locks: Dict[str, List] = {}
+        self.evictor_task: Optional[asyncio.Task] = None
+        self.stats = {"hits": 0, "misses": 0, "evicted": 0}
+        self.last_reconciled: Optional[float] = None
+
+    def path_for(self, text: str, language: str, tld: str = "com", slow: bool = False,
+                 engine: str = "gtts") -> Path:
+        return self.audio_dir / f"tts_{language}_{audio_key(text, language, tld, slow, engine)}.mp3"
+
+    def lookup(self, path: Path) -> Optional[str]:
+        """Return a cached file and mark it as recently used"""
+        try:
+            size = path.stat().st_size
+        except OSError:
+            return None
+        if size == 0:
+            return None
+
+        try:
+            # Popular files move to the back of the eviction queue
+            if not self.index.touch(path.name):
+                self.index.add(path.name, _language_of(path.name), size)
+        except Exception as e:
+            print(f"Audio index error: {e}")
+        return str(path)
+
+    def resolve(self, audio_id: str) -> Optional[str]:
+        """Cached file for an id taken from a URL (a file name without .mp3), if it exists"""
+        if not _AUDIO_ID_RE.fullmatch(audio_id):
+            return None
+        return self.lookup(self.audio_dir / f"{audio_id}.mp3")
+
+    def read(self, text: str, language: str, tld: str = "com", slow: bool = False,
+             engine: str = "gtts") -> Optional[bytes]:
+        """Bytes of the cached MP3 for this script, or None (also if it was just evicted)"""
+        cached = self.cached(text, language, tld, slow, engine)
+        if not cached:
+            return None
+        try:
+            return Path(cached).read_bytes()
+        except OSError:
+            return None
+
+    def cached(self, text: str, language: str, tld: str = "com", slow: bool = False,
+               engine: str = "gtts") -> Optional[str]:
+        """Path of the cached MP3 for this script, if it has been synthesized before"""
+        cached = self.lookup(self.path_for(text, language, tld, slow, engine))
+        self._count("hits" if cached else "misses")
+        return cached
+
+    def store(self, text: str, language: str, audio: bytes, tld: str = "com", slow: bool = False,
+              engine: str = "gtts") -> str:
+        """Save audio that was synthesized elsewhere (e.g. while streaming) under its hash"""
+        path = self.path_for(text, language, tld, slow, engine)
+        self.partial_dir.mkdir(parents=True, exist_ok=True)
+        partial = self.partial_dir / f"{path.stem}-{uuid.uuid4().hex}.mp3"
+        try:
+            partial.write_bytes(audio)
+            self._commit(partial, path, language)
+        finally:
+            partial.unlink(missing_ok=True)
+        return str(path)
+
+    def get_or_create(self, text: str, language: str, synthesize: Callable[[str], Optional[str]],
+                      tld: str = "com", slow: bool = False, engine: str = "gtts") -> Optional[str]:
+        """Return the cached MP3 for this script, calling synthesize(path) only on a miss
+
+        synthesize may return the name of the engine that actually produced the
+        audio; failover output is then filed under that engine instead.
+        """
+        path = self.path_for(text, language, tld, slow, engine)
+        cached = self.lookup(path)
+        if cached:
+            self._count("hits")
+            return cached
+
+        # Threads asking for the same audio wait for one synthesis
+        lock_name = path.name
+        key_lock = self._acquire_key_lock(lock_name)
+        try:
+            with key_lock:
+                cached = self.lookup(path)
+                if cached:
+                    self._count("hits")
+                    return cached
+
+                self._count("misses")
+                self.partial_dir.mkdir(parents=True, exist_ok=True)
+                partial = self.partial_dir / f"{path.stem}-{uuid.uuid4().hex}.mp3"
+                try:
+                    used = synthesize(str(partial))
+                    if used and used != engine:
+                        path = self.path_for(text, language, tld, slow, used)
+                    self._commit(partial, path, language)
+                finally:
+                    partial.unlink(missing_ok=True)
+        finally:
+            self._release_key_lock(lock_name)
+
+        return str(path) if path.exists() else None
+
+    def _commit(self, partial: Path, path: Path, language: str):
+        """Move a finished file into place and index it"""
+        size = partial.stat().st_size
+        os.replace(partial, path)
+        try:
+            self.index.add(path.name, language, size)
+        except Exception as e:
+            # Unindexed files are picked up by the next reconcile()
+            print(f"Audio index error: {e}")
+
+    def _count(self, stat: str, amount: int = 1):
+        with self.lock:
+            self.stats[stat] += amount
+
+    def get_stats(self) -> Dict:
+        """File count, bytes and per-language usage
+
+        Totals are counters in the index every worker writes to, updated with
+        each file written or evicted, so all workers report the same numbers
+        without a directory walk. hits, misses and evicted are this worker's
+        own counters.
+        """
+        try:
+            totals = self.index.totals()
+        except Exception as e:
+            print(f"Audio index error: {e}")
+            totals = {}
+        files = sum(count for count, _ in totals.values())
+        total_bytes = sum(size for _, size in totals.values())
+        with self.lock:
+            counters = dict(self.stats)
+        return {
+            "total_files": files,
+            "total_bytes": total_bytes,
+            "total_size_mb": round(total_bytes / (1024 * 1024), 2),
+            "max_bytes": self.max_bytes,
+            "languages": {
+                language: {"files": count, "bytes": size}
+                for language, (count, size) in sorted(totals.items())
+            },
+            "hits": counters["hits"],
+            "misses": counters["misses"],
+            "evicted": counters["evicted"],
+            "last_reconciled": self.last_reconciled,
+        }
+
+    def evict(self, max_age_seconds: Optional[float] = None) -> int:
+        """Delete files idle for too long, then least recently used ones until under the byte quota"""
+        max_age = self.max_age if max_age_seconds is None else max_age_seconds
+        removed = 0
+        if max_age > 0:
+            removed += self._delete(self.index.accessed_before(time.time() - max_age))
+
+        total = self.index.total_bytes()
+        while total > self.max_bytes:
+            victims = []
+            for name, size in self.index.least_recent(64):
+                if total <= self.max_bytes:
+                    break
+                victims.append((name, size))
+                total -= size
+            if not victims:
+                break
+            removed += self._delete(victims)
+
+        self._clean_partials()
+        return removed
+
+    def _delete(self, rows: Iterable[Tuple[str, int]]) -> int:
+        names = [name for name, _ in rows]
+        for name in names:
+            (self.audio_dir / name).unlink(missing_ok=True)
+        self.index.remove(names)
+        self._count("evicted", len(names))
+        return len(names)
+
+    def _clean_partials(self):
+        """Remove scratch files abandoned by crashed workers"""
+        if not self.partial_dir.exists():
+            return
+        cutoff = time.time() - _STALE_PARTIAL_SECONDS
+        for partial in self.partial_dir.iterdir():
+            try:
+                if partial.stat().st_mtime < cutoff:
+                    partial.unlink()
+            except OSError:
+                pass
+
+    def reconcile(self):
+        """Bring the index (and so the audio stats) in line with the directory
+
+        Catches files added or removed by hand or left unindexed by a failed
+        write; this is the only directory walk, and it runs in the background
+        every AUDIO_RECONCILE_INTERVAL_SECONDS.
+        """
+        indexed = self.index.entries()
+        on_disk = {}
+        for path in self.audio_dir.glob("*.mp3"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            on_disk[path.name] = stat
+
+        self.index.add_many(
+            (name, _language_of(name), stat.st_size, stat.st_mtime)
+            for name, stat in on_disk.items() if name not in indexed
+        )
+        self.index.remove(name for name in indexed if name not in on_disk)
+        # Corrects the counters too, should they ever drift from the index
+        self.index.rebuild_totals()
+        self.last_reconciled = time.time()
+
+    async def run_evictor(self, interval_seconds: float,
+                          reconcile_seconds: float = Config.AUDIO_RECONCILE_INTERVAL_SECONDS):
+        """Enforce the quota periodically, reconciling with the directory now and then (started from the FastAPI lifespan)"""
+        while True:
+            if self.last_reconciled is None or time.time() - self.last_reconciled >= reconcile_seconds:
+                try:
+                    await asyncio.to_thread(self.reconcile)
+                except Exception as e:
+                    print(f"Audio reconcile error: {e}")
+            try:
+                await asyncio.to_thread(self.evict)
+            except Exception as e:
+                print(f"Audio eviction error: {e}")
+            await asyncio.sleep(interval_seconds)
+
+    def start_evictor(self, interval_seconds: float = Config.AUDIO_EVICT_INTERVAL_SECONDS):
+        """Start the background evictor on the running event loop"""
+        if self.evictor_task is None or self.evictor_task.done():
+            self.evictor_task = asyncio.get_running_loop().create_task(self.run_evictor(interval_seconds))
+
+    async def stop_evictor(self):
+        """Cancel the background evictor"""
+        if self.evictor_task is not None:
+            self.evictor_task.cancel()
+            try:
+                await self.evictor_task
+            except asyncio.CancelledError:
+                pass
+            self.evictor_task = None
+
+    def _acquire_key_lock(self, name: str) -> threading.Lock:
+        """Reference-counted per-file lock"""
+        with self.lock:
+            entry = self.key_locks.setdefault(name, [threading.Lock(), 0])
+            entry[1] += 1
+            return entry[0]
+
+    def _release_key_lock(self, name: str):
+        with self.lock:
+            entry = self.key_locks[name]
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self.key_locks[name]
+
+
+def _language_of(name: str) -> str:
+    """Language code from a tts_<language>_<hash>.mp3 (or older news_<language>_...) name"""
+    parts = name.split('_')
+    return parts[1] if len(parts) > 2 else "unknown"
+
+
+audio_cache = AudioCache()
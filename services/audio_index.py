@@ -0,0 +1,148 @@
+#enhanced-tts-project\services\audio_index.py
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# An upsert rather than INSERT OR REPLACE: REPLACE deletes the old row without
+# firing the delete trigger, which would leave audio_totals counting it twice
+_UPSERT = (
+    "INSERT INTO audio (name, language, size, last_access) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT(name) DO UPDATE SET language = excluded.language, size = excluded.size, "
+    "last_access = excluded.last_access"
+)
+
+# Keep audio_totals in step with audio inside the same statement's transaction
+_TOTALS_TRIGGERS = (
+    "CREATE TRIGGER IF NOT EXISTS audio_totals_insert AFTER INSERT ON audio BEGIN"
+    " INSERT INTO audio_totals (language, files, bytes) VALUES (NEW.language, 1, NEW.size)"
+    " ON CONFLICT(language) DO UPDATE SET files = files + 1, bytes = bytes + NEW.size;"
+    " END",
+    "CREATE TRIGGER IF NOT EXISTS audio_totals_delete AFTER DELETE ON audio BEGIN"
+    " UPDATE audio_totals SET files = files - 1, bytes = bytes - OLD.size WHERE language = OLD.language;"
+    " END",
+    "CREATE TRIGGER IF NOT EXISTS audio_totals_update AFTER UPDATE OF language, size ON audio BEGIN"
+    " UPDATE audio_totals SET files = files - 1, bytes = bytes - OLD.size WHERE language = OLD.language;"
+    " INSERT INTO audio_totals (language, files, bytes) VALUES (NEW.language, 1, NEW.size)"
+    " ON CONFLICT(language) DO UPDATE SET files = files + 1, bytes = bytes + NEW.size;"
+    " END",
+)
+
+
+class AudioIndex:
+    """SQLite index of the audio store: size, language and last access per file
+
+    Lives next to the MP3s and is shared by every worker, like the cache
+    database, so quota and LRU decisions don't need a directory scan. Triggers
+    maintain per-language file and byte counts in audio_totals, so stats are
+    a lookup of a few rows rather than an aggregate over every file.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(
+            str(self.db_path), check_same_thread=False, isolation_level=None, timeout=5.0
+        )
+        self.conn.execute("PRAGMA busy_timeout=5000")
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.lock:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS audio ("
+                " name TEXT PRIMARY KEY,"
+                " language TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_audio_last_access ON audio (last_access)")
+            has_totals = self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'audio_totals'"
+            ).fetchone()
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS audio_totals ("
+                " language TEXT PRIMARY KEY,"
+                " files INTEGER NOT NULL,"
+                " bytes INTEGER NOT NULL)"
+            )
+            for trigger in _TOTALS_TRIGGERS:
+                self.conn.execute(trigger)
+        if not has_totals:
+            # Index written before audio_totals existed
+            self.rebuild_totals()
+
+    def add(self, name: str, language: str, size: int, last_access: Optional[float] = None):
+        """Record a new (or rewritten) file"""
+        with self.lock:
+            self.conn.execute(_UPSERT, (name, language, size, last_access or time.time()))
+
+    def add_many(self, rows: Iterable[Tuple[str, str, int, float]]):
+        """Record several (name, language, size, last_access) rows at once"""
+        with self.lock:
+            self.conn.executemany(_UPSERT, list(rows))
+
+    def touch(self, name: str) -> bool:
+        """Mark a file as just used; False if it isn't indexed"""
+        with self.lock:
+            cursor = self.conn.execute("UPDATE audio SET last_access = ? WHERE name = ?", (time.time(), name))
+        return cursor.rowcount > 0
+
+    def remove(self, names: Iterable[str]):
+        rows = [(name,) for name in names]
+        if not rows:
+            return
+        with self.lock:
+            self.conn.executemany("DELETE FROM audio WHERE name = ?", rows)
+
+    def total_bytes(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM audio_totals").fetchone()[0]
+
+    def least_recent(self, limit: int) -> List[Tuple[str, int]]:
+        """(name, size) of the least recently used files"""
+        with self.lock:
+            return self.conn.execute(
+                "SELECT name, size FROM audio ORDER BY last_access LIMIT ?", (limit,)
+            ).fetchall()
+
+    def accessed_before(self, cutoff: float) -> List[Tuple[str, int]]:
+        """(name, size) of files not used since an epoch time"""
+        with self.lock:
+            return self.conn.execute(
+                "SELECT name, size FROM audio WHERE last_access < ?", (cutoff,)
+            ).fetchall()
+
+    def totals(self) -> Dict[str, Tuple[int, int]]:
+        """{language: (files, bytes)} from the trigger-maintained audio_totals table"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT language, files, bytes FROM audio_totals WHERE files > 0"
+            ).fetchall()
+        return {language: (files, size) for language, files, size in rows}
+
+    def rebuild_totals(self):
+        """Recount audio_totals from the index in one transaction"""
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.execute("DELETE FROM audio_totals")
+                self.conn.execute(
+                    "INSERT INTO audio_totals (language, files, bytes)"
+                    " SELECT language, COUNT(*), SUM(size) FROM audio GROUP BY language"
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def entries(self) -> Dict[str, Tuple[str, int]]:
+        """{name: (language, size)} for every indexed file"""
+        with self.lock:
+            rows = self.conn.execute("SELECT name, language, size FROM audio").fetchall()
+        return {name: (language, size) for name, language, size in rows}
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
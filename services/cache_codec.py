@@ -0,0 +1,107 @@
+#enhanced-tts-project\services\cache_codec.py
+import json
+import threading
+import zlib
+from typing import Any, Tuple, Union
+
+from config import Config
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class CacheCodec:
+    """Binary encoding for cache values: msgpack (or compact JSON), optionally compressed
+
+    Every stored value carries its codec name ("msgpack+zstd", "json", ...) so
+    rows written under older settings or by other workers stay readable.
+    """
+
+    def __init__(self, serializer: str = Config.CACHE_SERIALIZER,
+                 compression: str = Config.CACHE_COMPRESSION,
+                 compress_min_bytes: int = Config.CACHE_COMPRESS_MIN_BYTES):
+        self.serializer = self._pick_serializer(serializer.lower())
+        self.compression = self._pick_compression(compression.lower())
+        self.compress_min_bytes = compress_min_bytes
+        # zstandard contexts aren't thread-safe, keep one per thread
+        self.local = threading.local()
+
+    def _pick_serializer(self, serializer: str) -> str:
+        if serializer in ("auto", "msgpack") and msgpack is not None:
+            return "msgpack"
+        if serializer == "msgpack":
+            print("CACHE_SERIALIZER is msgpack but the msgpack package is missing - using JSON")
+        return "json"
+
+    def _pick_compression(self, compression: str) -> str:
+        if compression in ("auto", "zstd") and zstandard is not None:
+            return "zstd"
+        if compression == "zstd":
+            print("CACHE_COMPRESSION is zstd but the zstandard package is missing - using zlib")
+        if compression in ("auto", "zstd", "zlib"):
+            return "zlib"
+        return "none"
+
+    @property
+    def name(self) -> str:
+        return self.serializer if self.compression == "none" else f"{self.serializer}+{self.compression}"
+
+    def encode(self, data: Any) -> Tuple[bytes, str]:
+        """Serialize a value, returning the bytes and the codec name to store with them"""
+        if self.serializer == "msgpack":
+            blob = msgpack.packb(data, default=str, use_bin_type=True)
+        else:
+            blob = json.dumps(data, default=str, separators=(",", ":")).encode("utf-8")
+
+        codec = self.serializer
+        # Small values don't shrink enough to be worth the decompression later
+        if self.compression != "none" and len(blob) >= self.compress_min_bytes:
+            blob = self._compress(blob)
+            codec = f"{codec}+{self.compression}"
+        return blob, codec
+
+    def decode(self, blob: Union[bytes, str], codec: str) -> Any:
+        """Deserialize a stored value; raises if it can't be read in this process"""
+        if isinstance(blob, str):
+            # Rows written before the binary format stored JSON text
+            blob = blob.encode("utf-8")
+
+        serializer, _, compression = codec.partition("+")
+        if compression:
+            blob = self._decompress(blob, compression)
+
+        if serializer == "json":
+            return json.loads(blob)
+        if serializer == "msgpack":
+            if msgpack is None:
+                raise ValueError("msgpack value but the msgpack package is missing")
+            return msgpack.unpackb(blob, raw=False)
+        raise ValueError(f"Unknown cache codec {codec!r}")
+
+    def _compress(self, blob: bytes) -> bytes:
+        if self.compression == "zstd":
+            if not hasattr(self.local, "compressor"):
+                self.local.compressor = zstandard.ZstdCompressor(level=3)
+            return self.local.compressor.compress(blob)
+        return zlib.compress(blob, 6)
+
+    def _decompress(self, blob: bytes, compression: str) -> bytes:
+        if compression == "zstd":
+            if zstandard is None:
+                raise ValueError("zstd value but the zstandard package is missing")
+            if not hasattr(self.local, "decompressor"):
+                self.local.decompressor = zstandard.ZstdDecompressor()
+            return self.local.decompressor.decompress(blob)
+        if compression == "zlib":
+            return zlib.decompress(blob)
+        raise ValueError(f"Unknown cache compression {compression!r}")
+
+
+cache_codec = CacheCodec()
@@ -1,82 +1,449 @@
 #enhanced-tts-project\services\cache_services.py
+import asyncio
+import contextvars
+import heapq
 import json
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Awaitable, Callable, Dict, Any, List, Optional, Tuple
 import threading
+import time
+
+from config import Config
+from services.cache_store import SQLiteCacheStore
+from services.single_flight import single_flight
+from services.topic_service import canonical_topic
+
+
+# True inside a background refresh: nested get_or_refresh calls then reload stale
+# entries instead of serving them, so a script cached on top of per-topic stages
+# (written at the same moment, so stale at the same moment) is rebuilt from
+# fresh summaries rather than stored again as fresh with the old ones
+_refreshing = contextvars.ContextVar("cache_refreshing", default=False)
+
+
+def cache_key(stage: str, topic: str, source_type: str = "", language: str = "") -> str:
+    """Build a cache key from a pipeline stage, canonical topic, source type and language"""
+    return f"{stage}:{source_type}:{language}:{canonical_topic(topic)}"
+
+
+def script_cache_key(topics: List[str], source_type: str = "", language: str = "") -> str:
+    """Build the cache key of a whole briefing script from its topics
+
+    Each topic is canonicalized on its own and joined with "|", which a
+    canonical topic never contains, so ["space", "exploration"] and
+    ["space exploration"] get different keys.
+    """
+    topics_part = "|".join(canonical_topic(topic) for topic in topics)
+    return f"segments:{source_type}:{language}:{topics_part}"
+
+
+class UncachedResult(Exception):
+    """Raised by a get_or_refresh loader to return a value without caching it"""
+
+    def __init__(self, value: Any):
+        super().__init__("uncached result")
+        self.value = value
+
 
 class CacheService:
-    def __init__(self, cache_duration_minutes: int = 30):
-        self.cache_file = Path("cache.json")
+    """Two-tier cache: a per-process LRU (L1) in front of a shared SQLite file (L2)
+
+    self.lock guards only the in-memory bookkeeping. SQLite reads and writes
+    happen outside it, and the async paths run them in a thread, so a slow
+    store (or the sweeper's bulk delete) never stalls the event loop.
+    """
+
+    def __init__(self, cache_duration_minutes: int = 30, cache_path: str = Config.CACHE_DB_PATH,
+                 max_entries: int = Config.CACHE_MAX_ENTRIES, max_bytes: int = Config.CACHE_MAX_BYTES,
+                 l1_ttl_seconds: float = Config.CACHE_L1_TTL_SECONDS,
+                 hard_ttl_minutes: int = Config.CACHE_HARD_TTL_MINUTES):
+        self.cache_file = Path(cache_path)
+        # Soft TTL: entries younger than this are fresh
         self.cache_duration = timedelta(minutes=cache_duration_minutes)
-        self.cache_data = self._load_cache()
+        # Hard TTL: stale entries are kept (and served by get_or_refresh) until then
+        self.hard_duration = max(self.cache_duration, timedelta(minutes=hard_ttl_minutes))
+        self.soft_ttl = self.cache_duration.total_seconds()
+        self.hard_ttl = self.hard_duration.total_seconds()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.l1_ttl = l1_ttl_seconds
         self.lock = threading.Lock()
+        # L2: SQLite file shared by all worker processes
+        self.store = SQLiteCacheStore(self.cache_file)
 
-    def _load_cache(self) -> Dict:
-        """Load cache from file"""
-        if self.cache_file.exists():
-            try:
-                with open(self.cache_file, 'r') as f:
-                    return json.load(f)
-            except:
-                return {}
-        return {}
-
-    def _save_cache(self):
-        """Save cache to file"""
+        # L1: per-process LRU in front of the shared store, least recent first
+        self.cache_data: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # Min-heap of (monotonic hard expiry, key); superseded items are skipped lazily
+        self.expiry_heap: List[Tuple[float, str]] = []
+        self.sweeper_task: Optional[asyncio.Task] = None
+        self.resident_bytes = 0
+        self.hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stale_hits = 0
+        self.refreshes = 0
+        self.l2_refreshes = 0
+        self.lazy_loads = 0
+        self.refreshing = set()
+        self.refresh_tasks = set()
+        self._load_cache()
+
+    def _load_cache(self):
+        """Index the newest persisted entries; their values are decoded on first access"""
         try:
-            with open(self.cache_file, 'w') as f:
-                json.dump(self.cache_data, f, default=str, indent=2)
+            entries = self.store.load_index(self.max_entries)
         except Exception as e:
-            print(f"Cache save error: {e}")
+            print(f"Cache load error: {e}")
+            return
+
+        if not entries:
+            entries = self._import_legacy_cache()
+
+        now = time.monotonic()
+        for key, entry in entries.items():
+            entry = self._stamp(entry)
+            if entry['expires'] > now:
+                self._remember(key, entry)
+
+    def _import_legacy_cache(self) -> Dict:
+        """One-time import of the old whole-file cache.json"""
+        legacy_file = Path(Config.CACHE_FILE_PATH)
+        if not legacy_file.exists() or legacy_file.resolve() == self.cache_file.resolve():
+            return {}
+
+        try:
+            with open(legacy_file, 'r') as f:
+                cache_data = json.load(f)
+            self.store.put_many({
+                key: {'data': entry['data'], 'created_at': datetime.fromisoformat(entry['timestamp']).timestamp()}
+                for key, entry in cache_data.items()
+            })
+            legacy_file.rename(legacy_file.with_name(legacy_file.name + ".migrated"))
+            return self.store.load_index(self.max_entries)
+        except Exception as e:
+            print(f"Legacy cache import error: {e}")
+            return {}
+
+    def _stamp(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert an entry's wall-clock write time into monotonic deadlines"""
+        now = time.monotonic()
+        written = now - (time.time() - entry['created_at'])
+        entry['loaded_at'] = now
+        entry['fresh_until'] = written + self.soft_ttl
+        entry['expires'] = written + self.hard_ttl
+        return entry
+
+    def _remember(self, key: str, entry: Dict[str, Any]):
+        """Put an entry in the memory tier and evict least recently used ones"""
+        self._forget(key)
+        if entry['size'] > self.max_bytes:
+            # Too big for memory, it only lives in the persistent store
+            return
+
+        self.cache_data[key] = entry
+        self.resident_bytes += entry['size']
+        heapq.heappush(self.expiry_heap, (entry['expires'], key))
+        if len(self.expiry_heap) > 2 * len(self.cache_data) + 64:
+            # Too many superseded items: rebuild from the live entries
+            self.expiry_heap = [(e['expires'], k) for k, e in self.cache_data.items()]
+            heapq.heapify(self.expiry_heap)
+
+        while len(self.cache_data) > self.max_entries or self.resident_bytes > self.max_bytes:
+            _, evicted = self.cache_data.popitem(last=False)
+            self.resident_bytes -= evicted['size']
+            self.evictions += 1
+
+    def _forget(self, key: str):
+        """Drop an entry from the memory tier"""
+        entry = self.cache_data.pop(key, None)
+        if entry is not None:
+            self.resident_bytes -= entry['size']
+
+    def _is_fresh(self, entry: Dict[str, Any]) -> bool:
+        return time.monotonic() < entry['fresh_until']
 
     def get(self, key: str) -> Optional[Dict[str, Any]]:
-        """Get cached data if not expired"""
+        """Get cached data if not expired (blocking, for synchronous callers)"""
+        entry, from_l2 = self._lookup(key)
         with self.lock:
-            if key in self.cache_data:
-                entry = self.cache_data[key]
-                cached_time = datetime.fromisoformat(entry['timestamp'])
-                
-                if datetime.now() - cached_time < self.cache_duration:
-                    return entry['data']
-                else:
-                    # Remove expired entry
-                    del self.cache_data[key]
-                    self._save_cache()
+            if entry is not None and self._is_fresh(entry):
+                self._count_hit(from_l2)
+                return entry['data']
+
+            self.misses += 1
         return None
 
+    async def get_or_refresh(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Stale-while-revalidate read
+
+        Fresh entries are returned as is. Entries past the soft TTL are returned
+        immediately while one background refresh runs. Missing entries, or ones
+        past the hard TTL, are loaded on the request path. Within a refresh,
+        stale entries are loaded too, so the refreshed value never builds on
+        stale inputs.
+        """
+        with self.lock:
+            entry = self._memory_entry(key)
+        from_l2 = False
+        if entry is None or 'data' not in entry or time.monotonic() >= entry['expires']:
+            # Needs the shared store: keep SQLite off the event loop
+            entry, from_l2 = await asyncio.to_thread(self._lookup, key)
+
+        with self.lock:
+            if entry is not None and self._is_fresh(entry):
+                self._count_hit(from_l2)
+                return entry['data']
+            if entry is not None and not _refreshing.get():
+                self.stale_hits += 1
+                self._schedule_refresh(key, loader)
+                return entry['data']
+            if entry is None:
+                self.misses += 1
+            else:
+                # A stale input of a value being refreshed: reload it now
+                self.refreshes += 1
+
+        # Concurrent cold requests for the same key share one load
+        if entry is None:
+            return await single_flight.do(f"cache:{key}", lambda: self._load_and_set(key, loader))
+        return await single_flight.do(f"cache:{key}", lambda: self._reload(key, loader))
+
+    def _count_hit(self, from_l2: bool):
+        self.hits += 1
+        if from_l2:
+            self.l2_hits += 1
+
+    async def _load_and_set(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            data = await loader()
+        except UncachedResult as result:
+            # Partial or error results are served once but never stored
+            return result.value
+        await asyncio.to_thread(self.set, key, data)
+        return data
+
+    async def _reload(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Refresh a stale entry, adopting a fresh value another worker already stored"""
+        stored = await asyncio.to_thread(self._fresh_from_store, key)
+        if stored is not None:
+            return stored['data']
+        return await self._load_and_set(key, loader)
+
+    def _fresh_from_store(self, key: str) -> Optional[Dict[str, Any]]:
+        """The shared store's entry for a key if it is fresh, put back in the memory tier"""
+        try:
+            entry = self.store.get(key)
+        except Exception as e:
+            print(f"Cache read error: {e}")
+            return None
+        if entry is None:
+            return None
+        entry = self._stamp(entry)
+        if not self._is_fresh(entry):
+            return None
+        with self.lock:
+            self._remember(key, entry)
+            self.l2_refreshes += 1
+        return entry
+
+    def _schedule_refresh(self, key: str, loader: Callable[[], Awaitable[Any]]):
+        """Start a background refresh unless one is already running (lock held)"""
+        if key in self.refreshing:
+            return
+        self.refreshing.add(key)
+        self.refreshes += 1
+        task = asyncio.get_running_loop().create_task(self._refresh(key, loader))
+        # Keep a reference so the task isn't garbage collected mid-flight
+        self.refresh_tasks.add(task)
+        task.add_done_callback(self.refresh_tasks.discard)
+
+    async def _refresh(self, key: str, loader: Callable[[], Awaitable[Any]]):
+        # Runs in its own task, so this only affects the loader's nested lookups
+        _refreshing.set(True)
+        try:
+            # With several workers, one of them has often refreshed the shared tier already
+            await single_flight.do(f"cache:{key}", lambda: self._reload(key, loader))
+        except Exception as e:
+            print(f"Cache refresh error for {key}: {e}")
+        finally:
+            with self.lock:
+                self.refreshing.discard(key)
+
+    def _memory_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        """The L1 entry for a key, unless it is older than the L1 TTL (lock held)"""
+        entry = self.cache_data.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry['loaded_at'] > self.l1_ttl:
+            # Other workers may have replaced or cleared it since we loaded it
+            self._forget(key)
+            return None
+        self.cache_data.move_to_end(key)
+        return entry
+
+    def _forget_entry(self, key: str, entry: Dict[str, Any]):
+        """Drop an entry from the memory tier unless a newer one replaced it meanwhile (lock held)"""
+        if self.cache_data.get(key) is entry:
+            self._forget(key)
+
+    def _lookup(self, key: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """Find an entry still within the hard TTL, and whether it came from L2
+
+        Blocks on SQLite, so async callers run it in a thread; self.lock is
+        taken only around the memory tier.
+        """
+        with self.lock:
+            entry = self._memory_entry(key)
+        from_l2 = False
+
+        if entry is not None and 'data' not in entry:
+            # Indexed at startup: decode the value now that someone wants it
+            value = None
+            try:
+                value = self.store.load_value(entry['rowid'], key)
+            except Exception as e:
+                print(f"Cache read error: {e}")
+            with self.lock:
+                if value is None:
+                    # Replaced by another worker since startup, read the current row below
+                    self._forget_entry(key, entry)
+                    entry = None
+                else:
+                    entry['data'] = value['data']
+                    self.lazy_loads += 1
+
+        if entry is None:
+            # Not in this worker's memory: another worker may have cached it
+            try:
+                entry = self.store.get(key)
+            except Exception as e:
+                print(f"Cache read error: {e}")
+            if entry is not None:
+                from_l2 = True
+                entry = self._stamp(entry)
+                with self.lock:
+                    self._remember(key, entry)
+
+        if entry is None:
+            return None, False
+
+        if time.monotonic() >= entry['expires']:
+            # Remove expired entry
+            with self.lock:
+                self._forget_entry(key, entry)
+            self._delete_persisted([key])
+            return None, False
+
+        return entry, from_l2
+
     def set(self, key: str, data: Dict[str, Any]):
         """Cache data with timestamp"""
+        blob, codec = self.store.codec.encode(data)
+        entry = self._stamp({
+            'data': data,
+            'created_at': time.time(),
+            'size': len(blob)
+        })
         with self.lock:
-            self.cache_data[key] = {
-                'data': data,
-                'timestamp': datetime.now().isoformat()
-            }
-            self._save_cache()
+            self._remember(key, entry)
+        # Single-row upsert instead of rewriting the whole cache
+        try:
+            self.store.put(key, blob, codec, entry['created_at'])
+        except Exception as e:
+            print(f"Cache save error: {e}")
+
+    def _delete_persisted(self, keys):
+        """Remove entries from the persistent store"""
+        try:
+            self.store.delete(keys)
+        except Exception as e:
+            print(f"Cache delete error: {e}")
 
-    def clear_expired(self):
-        """Remove all expired cache entries"""
+    def clear_expired(self) -> int:
+        """Remove all expired cache entries, popping only what is due from the expiry heap"""
         with self.lock:
-            current_time = datetime.now()
-            expired_keys = []
-            
-            for key, entry in self.cache_data.items():
-                cached_time = datetime.fromisoformat(entry['timestamp'])
-                if current_time - cached_time >= self.cache_duration:
-                    expired_keys.append(key)
-                    
-            for key in expired_keys:
-                del self.cache_data[key]
-                
-            if expired_keys:
-                self._save_cache()
+            now = time.monotonic()
+            expired = 0
+
+            # Stale entries stay around for get_or_refresh until the hard TTL
+            while self.expiry_heap and self.expiry_heap[0][0] <= now:
+                expires, key = heapq.heappop(self.expiry_heap)
+                entry = self.cache_data.get(key)
+                # Skip items superseded by a newer set() or already evicted
+                if entry is not None and entry['expires'] == expires:
+                    self._forget(key)
+                    expired += 1
+
+        # Also catches expired entries that were evicted from memory
+        try:
+            self.store.delete_older_than(time.time() - self.hard_ttl)
+        except Exception as e:
+            print(f"Cache delete error: {e}")
+
+        return expired
+
+    async def run_sweeper(self, interval_seconds: float):
+        """Purge expired entries periodically (started from the FastAPI lifespan)"""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await asyncio.to_thread(self.clear_expired)
+            except Exception as e:
+                print(f"Cache sweep error: {e}")
+
+    def start_sweeper(self, interval_seconds: float = Config.CACHE_SWEEP_INTERVAL_SECONDS):
+        """Start the background sweeper on the running event loop"""
+        if self.sweeper_task is None or self.sweeper_task.done():
+            self.sweeper_task = asyncio.get_running_loop().create_task(self.run_sweeper(interval_seconds))
+
+    async def stop_sweeper(self):
+        """Cancel the background sweeper"""
+        if self.sweeper_task is not None:
+            self.sweeper_task.cancel()
+            try:
+                await self.sweeper_task
+            except asyncio.CancelledError:
+                pass
+            self.sweeper_task = None
 
     def size(self) -> int:
         """Get cache size"""
         return len(self.cache_data)
 
+    def stats(self) -> Dict[str, Any]:
+        """Memory tier statistics"""
+        with self.lock:
+            # Stale entries served under stale-while-revalidate still avoided a load
+            served = self.hits + self.stale_hits
+            lookups = served + self.misses
+            return {
+                "entries": len(self.cache_data),
+                "resident_bytes": self.resident_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "l1_hits": self.hits - self.l2_hits,
+                "l2_hits": self.l2_hits,
+                "misses": self.misses,
+                "stale_hits": self.stale_hits,
+                "background_refreshes": self.refreshes,
+                "l2_refreshes": self.l2_refreshes,
+                "evictions": self.evictions,
+                "lazy_loads": self.lazy_loads,
+                "codec": self.store.codec.name,
+                "hit_ratio": round(served / lookups, 3) if lookups else 0.0,
+            }
+
     def clear_all(self):
         """Clear all cache"""
         with self.lock:
             self.cache_data.clear()
-            self._save_cache()
\ No newline at end of file
+            self.expiry_heap.clear()
+            self.resident_bytes = 0
+        try:
+            self.store.clear()
+        except Exception as e:
+            print(f"Cache clear error: {e}")
@@ -0,0 +1,166 @@
+#enhanced-tts-project\services\cache_store.py
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from services.cache_codec import CacheCodec, cache_codec
+
+
+class SQLiteCacheStore:
+    """Persistent cache backend: one row per key in a WAL-mode SQLite file
+
+    The file is the shared tier for every uvicorn worker on the host: each
+    process opens its own connection and SQLite's locking serializes writers.
+    Write times are stored as epoch seconds so expiry is a plain indexed
+    range delete. Values are binary blobs tagged with the codec that wrote them.
+    """
+
+    def __init__(self, db_path: Path, codec: CacheCodec = cache_codec):
+        self.db_path = Path(db_path)
+        self.codec = codec
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(
+            str(self.db_path), check_same_thread=False, isolation_level=None, timeout=5.0
+        )
+        # Wait on other workers' locks instead of failing, even while switching
+        # journal modes when several workers start at once
+        self.conn.execute("PRAGMA busy_timeout=5000")
+        # WAL keeps readers unblocked during writes and makes every write an
+        # atomic append to the log, so a crash can't leave a torn file behind
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+    def _create_schema(self):
+        """Create the table, upgrading the ISO-timestamp and JSON-text layouts if present"""
+        with self._transaction() as conn:
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(cache)")]
+            if "timestamp" in columns:
+                conn.execute("ALTER TABLE cache RENAME TO cache_old")
+            elif columns and "codec" not in columns:
+                # Existing rows are JSON text; they are decoded as such until rewritten
+                conn.execute("ALTER TABLE cache ADD COLUMN codec TEXT NOT NULL DEFAULT 'json'")
+
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " key TEXT PRIMARY KEY,"
+                " data BLOB NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " codec TEXT NOT NULL DEFAULT 'json')"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_created_at ON cache (created_at)")
+
+            if "timestamp" in columns:
+                rows = conn.execute("SELECT key, data, timestamp FROM cache_old").fetchall()
+                conn.executemany(
+                    "INSERT OR REPLACE INTO cache (key, data, created_at, codec) VALUES (?, ?, ?, 'json')",
+                    [(key, data, datetime.fromisoformat(ts).timestamp()) for key, data, ts in rows]
+                )
+                conn.execute("DROP TABLE cache_old")
+
+    @contextmanager
+    def _transaction(self):
+        """Run several statements as one atomic write"""
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conn
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def _decode(self, data, codec: str):
+        """Decode a stored value, or None if this process can't read it"""
+        try:
+            return {'data': self.codec.decode(data, codec)}
+        except Exception:
+            # Corrupt, or written with a codec whose package isn't installed here
+            return None
+
+    def load_index(self, limit: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """Load the newest entries as {key: {'rowid', 'created_at', 'size'}}, oldest first
+
+        Values aren't read: length() of a blob comes from the record header, so
+        startup cost doesn't grow with the size of the cached payloads.
+        """
+        query = "SELECT rowid, key, created_at, length(data) FROM cache ORDER BY created_at DESC"
+        params = ()
+        if limit is not None:
+            query += " LIMIT ?"
+            params = (limit,)
+        with self.lock:
+            rows = self.conn.execute(query, params).fetchall()
+
+        return {
+            key: {'rowid': rowid, 'created_at': created_at, 'size': size}
+            for rowid, key, created_at, size in reversed(rows)
+        }
+
+    def load_value(self, rowid: int, key: str) -> Optional[Dict[str, Any]]:
+        """Decode the value of an indexed row, or None if it was replaced or deleted since"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT data, codec FROM cache WHERE rowid = ? AND key = ?", (rowid, key)
+            ).fetchone()
+        if row is None:
+            return None
+        return self._decode(*row)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Read a single entry"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT data, created_at, codec FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        value = self._decode(row[0], row[2])
+        if value is None:
+            return None
+        return dict(value, created_at=row[1], size=len(row[0]))
+
+    def put(self, key: str, blob: bytes, codec: str, created_at: float):
+        """Insert or replace a single, already encoded entry"""
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO cache (key, data, created_at, codec) VALUES (?, ?, ?, ?)",
+                (key, blob, created_at, codec)
+            )
+
+    def put_many(self, entries: Dict[str, Dict[str, Any]]):
+        """Insert several {'data', 'created_at'} entries in one transaction"""
+        rows = []
+        for key, entry in entries.items():
+            blob, codec = self.codec.encode(entry['data'])
+            rows.append((key, blob, entry['created_at'], codec))
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO cache (key, data, created_at, codec) VALUES (?, ?, ?, ?)", rows
+            )
+
+    def delete(self, keys: Iterable[str]):
+        """Delete entries by key"""
+        rows = [(key,) for key in keys]
+        if not rows:
+            return
+        with self._transaction() as conn:
+            conn.executemany("DELETE FROM cache WHERE key = ?", rows)
+
+    def delete_older_than(self, created_at: float) -> int:
+        """Delete entries written before an epoch time (uses the created_at index)"""
+        with self.lock:
+            cursor = self.conn.execute("DELETE FROM cache WHERE created_at < ?", (created_at,))
+        return cursor.rowcount
+
+    def clear(self):
+        """Delete every entry"""
+        with self.lock:
+            self.conn.execute("DELETE FROM cache")
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
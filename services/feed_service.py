@@ -0,0 +1,242 @@
+#enhanced-tts-project\services\feed_service.py
+import html
+import re
+import threading
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+import feedparser
+
+from config import Config
+from services.http_client import fetch_get, http_get
+
+PARSE_CHUNK_SIZE = 16 * 1024
+
+# Titles are joined with NUL, which can't occur in XML text, so one regex/unescape
+# pass covers a whole feed without a tag match ever spanning two headlines
+_HEADLINE_SEP = "\x00"
+_TAG_RE = re.compile(r"</?[A-Za-z][^<>\x00]*>")
+# Without <source>, a " - " tail is only dropped if it is a publisher seen before
+# or a bare domain ("nytimes.com"); "Live Updates" and the like stay in the headline
+_DOMAIN_RE = re.compile(r"[\w-]+(\.[\w-]+)*\.[A-Za-z]{2,}")
+_MAX_KNOWN_PUBLISHERS = 5000
+# Publishers seen in <source> elements, to recognise them when a feed omits it.
+# Feeds are normalized from several threads (to_thread, Streamlit), hence the lock
+_known_publishers = set()
+_known_publishers_lock = threading.Lock()
+
+
+class FeedRevalidationStore:
+    """Keeps ETag/Last-Modified validators and parsed entries per feed URL"""
+
+    def __init__(self, max_feeds: int = 256):
+        self.max_feeds = max_feeds
+        self.feeds: "OrderedDict[str, Dict]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = {"revalidated": 0, "refreshed": 0}
+
+    def _usable(self, record: Optional[Dict], limit: Optional[int]) -> bool:
+        """A record parsed with a smaller item limit can't serve a bigger request"""
+        if record is None:
+            return False
+        return record["limit"] is None or (limit is not None and limit <= record["limit"])
+
+    def conditional_headers(self, url: str, limit: Optional[int] = None) -> Dict[str, str]:
+        """Build If-None-Match / If-Modified-Since headers for a known feed"""
+        with self.lock:
+            record = self.feeds.get(url)
+        if not self._usable(record, limit):
+            return {}
+
+        headers = {}
+        if record["etag"]:
+            headers["If-None-Match"] = record["etag"]
+        if record["last_modified"]:
+            headers["If-Modified-Since"] = record["last_modified"]
+        return headers
+
+    def get_entries(self, url: str, limit: Optional[int] = None) -> Optional[List[Dict]]:
+        """Get the last parsed entries for a feed (on 304 Not Modified)"""
+        with self.lock:
+            record = self.feeds.get(url)
+            if not self._usable(record, limit):
+                return None
+            self.feeds.move_to_end(url)
+            self.stats["revalidated"] += 1
+            return record["entries"]
+
+    def update(self, url: str, response_headers, entries: List[Dict], limit: Optional[int] = None):
+        """Remember validators and parsed entries from a 200 response"""
+        etag = response_headers.get("ETag")
+        last_modified = response_headers.get("Last-Modified")
+
+        with self.lock:
+            self.stats["refreshed"] += 1
+            if not etag and not last_modified:
+                # Nothing to revalidate against next time
+                self.feeds.pop(url, None)
+                return
+
+            self.feeds[url] = {
+                "etag": etag,
+                "last_modified": last_modified,
+                "entries": entries,
+                # Only a truncated parse needs to remember its limit
+                "limit": limit if limit is not None and len(entries) >= limit else None,
+            }
+            self.feeds.move_to_end(url)
+            while len(self.feeds) > self.max_feeds:
+                self.feeds.popitem(last=False)
+
+
+feed_store = FeedRevalidationStore()
+
+
+def _local_name(tag: str) -> str:
+    """Strip an XML namespace from a tag"""
+    return tag.rsplit("}", 1)[-1]
+
+
+def parse_rss_items(content: bytes, limit: Optional[int] = None) -> List[Dict]:
+    """Incrementally parse RSS <item>s, stopping after `limit` of them"""
+    parser = ET.XMLPullParser(events=("end",))
+    entries = []
+
+    for offset in range(0, len(content), PARSE_CHUNK_SIZE):
+        parser.feed(content[offset:offset + PARSE_CHUNK_SIZE])
+
+        for _, elem in parser.read_events():
+            if _local_name(elem.tag) != "item":
+                continue
+
+            fields = {_local_name(child.tag): child for child in elem}
+            source = fields.get("source")
+            entries.append({
+                "title": (fields["title"].text or "") if "title" in fields else "",
+                "link": (fields["link"].text or "") if "link" in fields else "",
+                "guid": (fields["guid"].text or "") if "guid" in fields else "",
+                "published": (fields["pubDate"].text or "") if "pubDate" in fields else "",
+                "source": (source.text or "") if source is not None else "",
+            })
+            # Drop the parsed subtree so memory stays flat
+            elem.clear()
+
+            if limit is not None and len(entries) >= limit:
+                return entries
+
+    return entries
+
+
+def parse_feed_entries(content: bytes, limit: Optional[int] = None) -> List[Dict]:
+    """Parse an RSS document into plain entry dicts"""
+    if Config.FEED_PARSER == "streaming":
+        try:
+            return parse_rss_items(content, limit)
+        except ET.ParseError:
+            # Malformed XML - feedparser is far more forgiving
+            pass
+
+    feed = feedparser.parse(content)
+    entries = []
+
+    for entry in feed.entries[:limit]:
+        entries.append({
+            "title": entry.get("title", ""),
+            "link": entry.get("link", ""),
+            "guid": entry.get("id", ""),
+            "published": entry.get("published", ""),
+            "source": entry.get("source", {}).get("title", ""),
+        })
+
+    return entries
+
+
+def _is_publisher(tail: str) -> bool:
+    if _DOMAIN_RE.fullmatch(tail):
+        return True
+    with _known_publishers_lock:
+        return tail.casefold() in _known_publishers
+
+
+def normalize_headlines(entries: Iterable[Dict]) -> List[str]:
+    """Clean a feed's titles in one pass: strip tags, unescape entities, drop publisher suffix"""
+    entries = list(entries)
+    if not entries:
+        return []
+
+    joined = _HEADLINE_SEP.join(entry.get("title") or "" for entry in entries)
+    # Most headlines carry no markup or entities, so skip both passes when possible
+    if "<" in joined:
+        joined = _TAG_RE.sub("", joined)
+    if "&" in joined:
+        joined = html.unescape(joined)
+
+    sources = {(entry.get("source") or "").strip().casefold() for entry in entries} - {""}
+    if sources:
+        with _known_publishers_lock:
+            for source in sources:
+                if len(_known_publishers) >= _MAX_KNOWN_PUBLISHERS:
+                    break
+                _known_publishers.add(source)
+
+    headlines = []
+    for entry, title in zip(entries, joined.split(_HEADLINE_SEP)):
+        title = " ".join(title.split())
+        source = (entry.get("source") or "").strip()
+
+        if source and title.endswith(f" - {source}"):
+            title = title[:-len(source) - 3]
+        elif not source:
+            # Google News appends the publisher even when <source> is missing;
+            # anything else after " - " is part of the headline
+            head, sep, tail = title.rpartition(" - ")
+            if sep and head and _is_publisher(tail):
+                title = head
+
+        headlines.append(title.strip())
+
+    return headlines
+
+
+async def fetch_feed_entries(url: str, headers: Optional[Dict[str, str]] = None,
+                             timeout: float = 10, limit: Optional[int] = None) -> List[Dict]:
+    """Fetch an RSS feed, revalidating with the upstream when we have validators"""
+    request_headers = dict(headers or {})
+    request_headers.update(feed_store.conditional_headers(url, limit))
+
+    response = await fetch_get(url, headers=request_headers, timeout=timeout)
+
+    if response.status_code == 304:
+        entries = feed_store.get_entries(url, limit)
+        if entries is not None:
+            return entries[:limit]
+        # Validators were evicted meanwhile, fetch the full document
+        response = await fetch_get(url, headers=headers, timeout=timeout)
+
+    response.raise_for_status()
+
+    entries = parse_feed_entries(response.content, limit)
+    feed_store.update(url, response.headers, entries, limit)
+    return entries
+
+
+def fetch_feed_entries_sync(url: str, headers: Optional[Dict[str, str]] = None,
+                            timeout: float = 10, limit: Optional[int] = None) -> List[Dict]:
+    """Blocking variant of fetch_feed_entries for the Streamlit apps"""
+    request_headers = dict(headers or {})
+    request_headers.update(feed_store.conditional_headers(url, limit))
+
+    response = http_get(url, headers=request_headers, timeout=timeout)
+
+    if response.status_code == 304:
+        entries = feed_store.get_entries(url, limit)
+        if entries is not None:
+            return entries[:limit]
+        response = http_get(url, headers=headers, timeout=timeout)
+
+    response.raise_for_status()
+
+    entries = parse_feed_entries(response.content, limit)
+    feed_store.update(url, response.headers, entries, limit)
+    return entries
@@ -0,0 +1,114 @@
+#enhanced-tts-project\services\http_client.py
+import asyncio
+import importlib.util
+import threading
+from typing import Dict, Optional
+
+import httpx
+
+from config import Config
+from services.rate_limiter import rate_limiter
+
+_async_client: Optional[httpx.AsyncClient] = None
+_async_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_client: Optional[httpx.Client] = None
+_client_lock = threading.Lock()
+
+
+def _client_options() -> Dict:
+    """Pool, timeout and protocol settings shared by the sync and async clients"""
+    http2 = Config.HTTP2_ENABLED
+    if http2 and importlib.util.find_spec("h2") is None:
+        print("HTTP2_ENABLED is set but the h2 package is missing - using HTTP/1.1")
+        http2 = False
+
+    return {
+        "http2": http2,
+        "follow_redirects": True,
+        "headers": {"User-Agent": Config.USER_AGENT},
+        "timeout": httpx.Timeout(Config.REQUEST_TIMEOUT, connect=Config.HTTP_CONNECT_TIMEOUT),
+        # Keep-alive connections are pooled per host
+        "limits": httpx.Limits(
+            max_connections=Config.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=Config.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=Config.HTTP_KEEPALIVE_EXPIRY,
+        ),
+    }
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Get the shared async HTTP client for the running event loop"""
+    global _async_client, _async_client_loop
+
+    loop = asyncio.get_running_loop()
+    # A client is bound to the loop it was created on, so recreate it if the
+    # loop changed (e.g. separate asyncio.run() calls in scripts)
+    if _async_client is None or _async_client.is_closed or _async_client_loop is not loop:
+        _async_client = httpx.AsyncClient(**_client_options())
+        _async_client_loop = loop
+
+    return _async_client
+
+
+def get_client() -> httpx.Client:
+    """Get the shared blocking HTTP client (Streamlit apps, worker threads)"""
+    global _client
+
+    with _client_lock:
+        if _client is None or _client.is_closed:
+            _client = httpx.Client(**_client_options())
+        return _client
+
+
+async def close_async_client():
+    """Close the shared async HTTP client"""
+    global _async_client, _async_client_loop
+
+    if _async_client is not None and not _async_client.is_closed:
+        await _async_client.aclose()
+    _async_client = None
+    _async_client_loop = None
+
+
+def close_client():
+    """Close the shared blocking HTTP client"""
+    global _client
+
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = None
+
+
+async def fetch(method: str, url: str, **kwargs) -> httpx.Response:
+    """Perform a non-blocking HTTP request with the shared client"""
+    # Only waits when the host's request budget is used up
+    await rate_limiter.acquire(url)
+    client = get_async_client()
+    return await client.request(method, url, **kwargs)
+
+
+async def fetch_get(url: str, **kwargs) -> httpx.Response:
+    """Non-blocking GET request"""
+    return await fetch("GET", url, **kwargs)
+
+
+async def fetch_post(url: str, **kwargs) -> httpx.Response:
+    """Non-blocking POST request"""
+    return await fetch("POST", url, **kwargs)
+
+
+def request(method: str, url: str, **kwargs) -> httpx.Response:
+    """Perform a blocking HTTP request with the shared client"""
+    rate_limiter.acquire_sync(url)
+    return get_client().request(method, url, **kwargs)
+
+
+def http_get(url: str, **kwargs) -> httpx.Response:
+    """Blocking GET request"""
+    return request("GET", url, **kwargs)
+
+
+def http_post(url: str, **kwargs) -> httpx.Response:
+    """Blocking POST request"""
+    return request("POST", url, **kwargs)
@@ -0,0 +1,78 @@
+#enhanced-tts-project\services\mp3_utils.py
+from typing import Iterable, Optional
+
+# Layer III bitrates in kbps by bitrate index
+_BITRATES_V1 = (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320)
+_BITRATES_V2 = (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160)
+# Sample rates by version bits (0 = MPEG 2.5, 2 = MPEG 2, 3 = MPEG 1)
+_SAMPLE_RATES = {0: (11025, 12000, 8000), 2: (22050, 24000, 16000), 3: (44100, 48000, 32000)}
+
+
+def _id3v2_length(data: bytes, offset: int) -> int:
+    """Size of an ID3v2 tag starting at offset, or 0 if there is none"""
+    if data[offset:offset + 3] != b"ID3" or len(data) < offset + 10:
+        return 0
+    size_bytes = data[offset + 6:offset + 10]
+    size = 0
+    for byte in size_bytes:
+        # Syncsafe integer: 7 bits per byte
+        size = (size << 7) | (byte & 0x7F)
+    footer = 10 if data[offset + 5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def frame_length(data: bytes, offset: int) -> Optional[int]:
+    """Length of the MPEG Layer III frame whose header starts at offset, or None if invalid"""
+    if offset + 4 > len(data) or data[offset] != 0xFF or data[offset + 1] & 0xE0 != 0xE0:
+        return None
+
+    version = (data[offset + 1] >> 3) & 0x03
+    layer = (data[offset + 1] >> 1) & 0x03
+    bitrate_index = data[offset + 2] >> 4
+    rate_index = (data[offset + 2] >> 2) & 0x03
+    padding = (data[offset + 2] >> 1) & 0x01
+
+    if version == 1 or layer != 1 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+
+    sample_rate = _SAMPLE_RATES[version][rate_index]
+    if version == 3:
+        return 144000 * _BITRATES_V1[bitrate_index] // sample_rate + padding
+    return 72000 * _BITRATES_V2[bitrate_index] // sample_rate + padding
+
+
+def _is_info_frame(frame: bytes) -> bool:
+    """Xing/Info/VBRI frames hold no audio, only the length of the file they started"""
+    return b"Xing" in frame[:48] or b"Info" in frame[:48] or frame[36:40] == b"VBRI"
+
+
+def audio_frames(data: bytes) -> bytes:
+    """Raw MPEG audio frames of a file, without ID3 tags or a Xing/Info header frame"""
+    start = 0
+    while True:
+        tag_length = _id3v2_length(data, start)
+        if not tag_length:
+            break
+        start += tag_length
+
+    end = len(data)
+    if end - start >= 128 and data[end - 128:end - 125] == b"TAG":
+        end -= 128
+
+    # Skip any junk before the first real frame
+    while start < end and frame_length(data, start) is None:
+        start += 1
+    if start >= end:
+        return b""
+
+    first = frame_length(data, start)
+    if _is_info_frame(data[start:start + first]):
+        # The header describes only this chunk; left in, players would stop after it
+        start += first
+
+    return data[start:end]
+
+
+def concat_mp3(parts: Iterable[bytes]) -> bytes:
+    """Join MP3 files losslessly by concatenating their audio frames in order"""
+    return b"".join(audio_frames(part) for part in parts)
@@ -1,20 +1,22 @@
 #enhanced-tts-project\services\news_service.py
-import asyncio
-import requests
-import feedparser
 from typing import Dict, List
 from urllib.parse import quote_plus
-from bs4 import BeautifulSoup
 import re
 from datetime import datetime
 from models import TopicAnalysis
+from config import Config
+from services.http_client import fetch_get
+from services.feed_service import fetch_feed_entries, normalize_headlines
+from services.single_flight import single_flight, flight_key
+from services.topic_service import canonical_topic
+from utils import generate_valid_news_url, NEWS_LOCALE
 
 class NewsService:
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
+        # Connections are pooled by the shared client in services.http_client
+        self.headers = {
             'User-Agent': 'NewsNinja/2.0 (Educational)'
-        })
+        }
 
     async def analyze_topics(self, topics: List[str], source_type: str) -> Dict:
         """Enhanced topic analysis with sentiment"""
@@ -23,34 +25,34 @@ class NewsService:
         for topic in topics:
             analysis = TopicAnalysis(topic=topic)
             
+            # Identical topics requested concurrently share one fetch
             if source_type in ["news", "both"]:
-                analysis.news_summary = await self._get_news_summary(topic)
+                analysis.news_summary = await single_flight.do(
+                    flight_key("news-summary", topic, NEWS_LOCALE),
+                    lambda: self._get_news_summary(topic)
+                )
                 
             if source_type in ["reddit", "both"]:
-                analysis.reddit_summary = await self._get_reddit_summary(topic)
+                analysis.reddit_summary = await single_flight.do(
+                    flight_key("reddit-summary", topic),
+                    lambda: self._get_reddit_summary(topic)
+                )
                 
             # Analyze sentiment and extract key points
             analysis.sentiment = self._analyze_sentiment(analysis.news_summary, analysis.reddit_summary)
             analysis.key_points = self._extract_key_points(analysis.news_summary, analysis.reddit_summary)
             
             results.append(analysis)
-            await asyncio.sleep(1)  # Rate limiting
             
         return {"topics": results}
 
     async def _get_news_summary(self, topic: str) -> str:
         """Get news with better parsing"""
         try:
-            url = f"https://news.google.com/rss/search?q={quote_plus(topic)}&hl=en-US&gl=US&ceid=US:en"
-            response = self.session.get(url, timeout=10)
-            
-            feed = feedparser.parse(response.content)
-            headlines = []
-            
-            for entry in feed.entries[:8]:
-                # Clean headline
-                title = BeautifulSoup(entry.title, "html.parser").get_text()
-                headlines.append(title)
+            url = generate_valid_news_url(topic)
+            entries = await fetch_feed_entries(url, headers=self.headers, timeout=10, limit=8)
+            # Clean all headlines in one pass
+            headlines = normalize_headlines(entries)
                 
             return self._create_smart_summary(headlines, topic)
             
@@ -60,8 +62,8 @@ class NewsService:
     async def _get_reddit_summary(self, topic: str) -> str:
         """Enhanced Reddit analysis"""
         try:
-            url = f"https://www.reddit.com/search.json?q={quote_plus(topic)}&sort=hot&limit=10&t=week"
-            response = self.session.get(url, timeout=10)
+            url = f"{Config.REDDIT_SEARCH_URL}?q={quote_plus(canonical_topic(topic))}&sort=hot&limit=10&t=week"
+            response = await fetch_get(url, headers=self.headers, timeout=10)
             data = response.json()
             
             posts = data.get('data', {}).get('children', [])
@@ -129,10 +131,14 @@ class NewsService:
             
         return points
 
-    def create_broadcast_script(self, analysis: Dict, language: str = "en") -> str:
-        """Create engaging broadcast script"""
-        script_parts = [
-            "Welcome to NewsNinja, your AI-powered news briefing.",
+    def create_broadcast_segments(self, analysis: Dict, language: str = "en") -> List[str]:
+        """Create the broadcast script as intro, one segment per topic and outro
+
+        Segments are synthesized and cached separately, so a briefing that
+        changes one topic only re-synthesizes that topic.
+        """
+        segments = [
+            "Welcome to NewsNinja, your AI-powered news briefing. "
             f"Here's your analysis for {datetime.now().strftime('%B %d, %Y')}."
         ]
         
@@ -140,7 +146,7 @@ class NewsService:
             topic = topic_data.topic
             sentiment = topic_data.sentiment
             
-            script_parts.append(f"Now covering {topic}.")
+            script_parts = [f"Now covering {topic}."]
             
             if topic_data.news_summary:
                 script_parts.append(topic_data.news_summary)
@@ -149,10 +155,15 @@ class NewsService:
                 script_parts.append(f"Social media perspective: {topic_data.reddit_summary}")
                 
             script_parts.append(f"Overall sentiment for {topic} appears {sentiment}.")
+            segments.append(" ".join(script_parts))
             
-        script_parts.append("That concludes your NewsNinja briefing. Stay informed!")
+        segments.append("That concludes your NewsNinja briefing. Stay informed!")
         
-        return " ".join(script_parts)
+        return segments
+
+    def create_broadcast_script(self, analysis: Dict, language: str = "en") -> str:
+        """Create engaging broadcast script"""
+        return " ".join(self.create_broadcast_segments(analysis, language))
 
     async def get_trending_topics(self) -> List[str]:
         """Get trending topics from Google Trends"""
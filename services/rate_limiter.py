@@ -0,0 +1,112 @@
+#enhanced-tts-project\services\rate_limiter.py
+import asyncio
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from config import Config
+
+
+class TokenBucket:
+    """Thread-safe token bucket allowing bursts up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token and return how long the caller must wait for it"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # Tokens may go negative: later callers queue up behind earlier ones
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+
+def configured_upstreams() -> Dict[str, str]:
+    """Configured upstream base URLs and the real host whose RATE_LIMITS rule governs each"""
+    return {
+        Config.GOOGLE_NEWS_RSS_URL: "news.google.com",
+        Config.REDDIT_SEARCH_URL: "reddit.com",
+        Config.HUGGINGFACE_API_URL: "huggingface.co",
+        Config.GROQ_BASE_URL: "api.groq.com",
+    }
+
+
+class RateLimiter:
+    """Process-wide registry of per-upstream token buckets
+
+    URLs under a configured upstream base URL use that upstream's bucket
+    whatever host serves them, so when every base URL points at one stand-in
+    (replay_server.py) each upstream still keeps its own budget. Other URLs
+    are limited per host.
+    """
+
+    def __init__(self, limits: str = Config.RATE_LIMITS, default: str = Config.DEFAULT_RATE_LIMIT,
+                 upstreams: Optional[Dict[str, str]] = None):
+        if upstreams is None:
+            upstreams = configured_upstreams()
+        # Longest base URL first, so nested paths on one stand-in resolve correctly
+        self.upstreams = sorted(
+            ((base.split("?", 1)[0].rstrip("/"), host.lower()) for base, host in upstreams.items() if base),
+            key=lambda upstream: len(upstream[0]), reverse=True
+        )
+        self.rules: List[Tuple[str, float, float]] = []
+        for item in limits.split(","):
+            if "=" not in item:
+                continue
+            host, spec = item.split("=", 1)
+            self.rules.append((host.strip().lower(), *self._parse_spec(spec)))
+        # Most specific host first
+        self.rules.sort(key=lambda rule: len(rule[0]), reverse=True)
+        self.default = self._parse_spec(default)
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _parse_spec(spec: str) -> Tuple[float, float]:
+        """Parse 'rate:burst' into floats"""
+        rate, _, burst = spec.strip().partition(":")
+        return float(rate), float(burst or rate)
+
+    def bucket_for(self, url: str) -> TokenBucket:
+        """Get the bucket governing a URL's upstream (or host)"""
+        host = (urlsplit(url).hostname or "").lower()
+        target = url.split("?", 1)[0]
+        for base, upstream_host in self.upstreams:
+            if target == base or target.startswith(base + "/"):
+                host = upstream_host
+                break
+        key, rate, burst = host, *self.default
+        for rule_host, rule_rate, rule_burst in self.rules:
+            if host == rule_host or host.endswith("." + rule_host):
+                key, rate, burst = rule_host, rule_rate, rule_burst
+                break
+
+        with self.lock:
+            if key not in self.buckets:
+                self.buckets[key] = TokenBucket(rate, burst)
+            return self.buckets[key]
+
+    async def acquire(self, url: str):
+        """Wait (without blocking the loop) until a request to url is allowed"""
+        delay = self.bucket_for(url).reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def acquire_sync(self, url: str):
+        """Blocking variant for synchronous callers such as the Streamlit apps"""
+        delay = self.bucket_for(url).reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+
+rate_limiter = RateLimiter()
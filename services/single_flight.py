@@ -0,0 +1,47 @@
+#enhanced-tts-project\services\single_flight.py
+import asyncio
+from typing import Awaitable, Callable, Dict, TypeVar
+
+from services.topic_service import canonical_topic
+
+T = TypeVar("T")
+
+
+def flight_key(source: str, topic: str, locale: str = "") -> str:
+    """Build a coalescing key from source, canonical topic and locale"""
+    return f"{source}:{locale}:{canonical_topic(topic)}"
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one in-flight task"""
+
+    def __init__(self):
+        self.calls: Dict[str, asyncio.Task] = {}
+        self.stats = {"executed": 0, "coalesced": 0}
+
+    async def do(self, key: str, func: Callable[[], Awaitable[T]]) -> T:
+        """Run func() unless an identical call is already in flight, then share its result"""
+        loop = asyncio.get_running_loop()
+        task = self.calls.get(key)
+
+        if task is not None and task.get_loop() is loop:
+            self.stats["coalesced"] += 1
+        else:
+            self.stats["executed"] += 1
+            task = loop.create_task(func())
+            self.calls[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+
+        # Shield so one caller disconnecting doesn't cancel the fetch for the others
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task):
+        """Forget a finished call so the next request fetches fresh data"""
+        if self.calls.get(key) is task:
+            del self.calls[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved even if every caller went away
+            task.exception()
+
+
+single_flight = SingleFlight()
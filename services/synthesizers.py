@@ -0,0 +1,103 @@
+#enhanced-tts-project\services\synthesizers.py
+import importlib.util
+from abc import ABC, abstractmethod
+import io
+import shutil
+import subprocess
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+from gtts import gTTS
+
+from config import Config
+
+
+class Synthesizer(ABC):
+    """A TTS engine that turns one chunk of text into MP3 bytes"""
+
+    name = ""
+
+    def available(self) -> bool:
+        return True
+
+    @abstractmethod
+    def synthesize(self, text: str, language: str, tld: str = "com", slow: bool = False) -> bytes:
+        """Return the MP3 for one chunk of text"""
+
+
+class GTTSSynthesizer(Synthesizer):
+    """Google Translate TTS: good voices, one network round trip per ~100 characters"""
+
+    name = "gtts"
+
+    def synthesize(self, text: str, language: str, tld: str = "com", slow: bool = False) -> bytes:
+        fp = io.BytesIO()
+        gTTS(text=text, lang=language, tld=tld, slow=slow).write_to_fp(fp)
+        return fp.getvalue()
+
+
+class LocalSynthesizer(Synthesizer):
+    """Offline engine: espeak-ng/espeak (or pyttsx3) to WAV, then lame/ffmpeg to MP3
+
+    Output is encoded as 24 kHz mono 32 kbps, the same format gTTS returns, so
+    chunks from both engines can be spliced into one file.
+    """
+
+    name = "local"
+
+    def __init__(self):
+        self.espeak = shutil.which("espeak-ng") or shutil.which("espeak")
+        self.has_pyttsx3 = importlib.util.find_spec("pyttsx3") is not None
+        # pyttsx3 drives a single platform engine per process
+        self.pyttsx3_lock = threading.Lock()
+        if shutil.which("lame"):
+            self.encoder = [shutil.which("lame"), "--quiet", "-m", "m", "--resample", "24", "-b", "32", "-", "-"]
+        elif shutil.which("ffmpeg"):
+            self.encoder = [shutil.which("ffmpeg"), "-loglevel", "error", "-f", "wav", "-i", "pipe:0",
+                            "-ac", "1", "-ar", "24000", "-b:a", "32k", "-f", "mp3", "pipe:1"]
+        else:
+            self.encoder = None
+
+    def available(self) -> bool:
+        return self.encoder is not None and (self.espeak is not None or self.has_pyttsx3)
+
+    def synthesize(self, text: str, language: str, tld: str = "com", slow: bool = False) -> bytes:
+        if not self.available():
+            raise RuntimeError("Local TTS needs espeak-ng (or pyttsx3) and lame or ffmpeg")
+        return self._run(self.encoder, self._speak(text, language, slow))
+
+    def _speak(self, text: str, language: str, slow: bool) -> bytes:
+        """Render text to WAV bytes"""
+        if self.espeak:
+            return self._run([self.espeak, "-v", language, "-s", "130" if slow else "170", "--stdout", "--stdin"],
+                             text.encode("utf-8"))
+
+        import pyttsx3
+        with self.pyttsx3_lock, tempfile.TemporaryDirectory() as tmp:
+            wav_path = Path(tmp) / "speech.wav"
+            engine = pyttsx3.init()
+            engine.setProperty("rate", 130 if slow else 170)
+            engine.save_to_file(text, str(wav_path))
+            engine.runAndWait()
+            return wav_path.read_bytes()
+
+    def _run(self, command, stdin: bytes) -> bytes:
+        result = subprocess.run(command, input=stdin, capture_output=True, check=True,
+                                timeout=Config.REQUEST_TIMEOUT)
+        return result.stdout
+
+
+SYNTHESIZERS: Dict[str, Synthesizer] = {
+    "gtts": GTTSSynthesizer(),
+    "local": LocalSynthesizer(),
+}
+
+
+def get_synthesizer(name: Optional[str] = None) -> Synthesizer:
+    """Look up an engine by name (default TTS_ENGINE)"""
+    name = (name or Config.TTS_ENGINE).lower()
+    if name not in SYNTHESIZERS:
+        raise ValueError(f"Unknown TTS engine '{name}' (available: {', '.join(SYNTHESIZERS)})")
+    return SYNTHESIZERS[name]
@@ -0,0 +1,85 @@
+#enhanced-tts-project\services\topic_service.py
+import re
+import threading
+import unicodedata
+from typing import Dict, List
+
+from config import Config
+
+# Anything but letters, digits and the symbols that carry meaning in topics
+# ("c++", "c#", "node.js", "r&d", "covid-19") becomes a word break
+_SEPARATOR_RE = re.compile(r"[^\w+#.&-]+")
+_EDGE_CHARS = ".-&"
+
+
+def parse_aliases(spec: str) -> Dict[str, str]:
+    """Parse "alias=canonical topic,..." into a lookup table of normalized forms"""
+    aliases = {}
+    for pair in spec.split(","):
+        alias, sep, canonical = pair.partition("=")
+        if not sep:
+            continue
+        alias, canonical = normalize_topic(alias), normalize_topic(canonical)
+        if alias and canonical:
+            aliases[alias] = canonical
+    return aliases
+
+
+def normalize_topic(topic: str) -> str:
+    """Case-fold a topic and collapse whitespace and punctuation"""
+    topic = unicodedata.normalize("NFKC", topic).casefold()
+    words = (word.strip(_EDGE_CHARS) for word in _SEPARATOR_RE.sub(" ", topic).split())
+    return " ".join(word for word in words if word)
+
+
+class TopicCanonicalizer:
+    """Maps user-entered topics onto one canonical spelling before fetching and caching"""
+
+    def __init__(self, aliases: str = Config.TOPIC_ALIASES):
+        self.aliases = parse_aliases(aliases)
+        self.lock = threading.Lock()
+        self.stats = {"topics": 0, "rewritten": 0, "aliased": 0, "merged": 0}
+
+    def canonical(self, topic: str) -> str:
+        """Canonical form of a single topic"""
+        normalized = normalize_topic(topic)
+        return self.aliases.get(normalized, normalized)
+
+    def canonicalize_topics(self, topics: List[str]) -> List[str]:
+        """Canonicalize a request's topics, dropping ones that collapse onto an earlier topic"""
+        canonical_topics = []
+        rewritten = aliased = merged = 0
+
+        for topic in topics:
+            normalized = normalize_topic(topic)
+            canonical = self.aliases.get(normalized, normalized)
+            if not canonical:
+                continue
+            if canonical != topic:
+                rewritten += 1
+            if canonical != normalized:
+                aliased += 1
+            if canonical in canonical_topics:
+                merged += 1
+                continue
+            canonical_topics.append(canonical)
+
+        with self.lock:
+            self.stats["topics"] += len(topics)
+            self.stats["rewritten"] += rewritten
+            self.stats["aliased"] += aliased
+            self.stats["merged"] += merged
+        return canonical_topics
+
+    def get_stats(self) -> Dict[str, int]:
+        """Counters: topics seen, rewritten onto a shared key, resolved via alias, merged within a request"""
+        with self.lock:
+            return dict(self.stats, aliases=len(self.aliases))
+
+
+topic_canonicalizer = TopicCanonicalizer()
+
+
+def canonical_topic(topic: str) -> str:
+    """Canonical form of a topic using the configured alias table"""
+    return topic_canonicalizer.canonical(topic)
@@ -0,0 +1,191 @@
+#enhanced-tts-project\services\tts_service.py
+import asyncio
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, List, Optional, Tuple
+
+from config import Config
+from services.audio_cache import audio_cache
+from services.mp3_utils import audio_frames, concat_mp3
+from services.synthesizers import SYNTHESIZERS, get_synthesizer
+
+# Bounded pool shared by every request so a burst of long scripts can't open
+# an unbounded number of connections to the TTS endpoint
+tts_executor = ThreadPoolExecutor(max_workers=Config.TTS_MAX_WORKERS, thread_name_prefix="tts")
+
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def split_text(text: str, max_length: int = Config.TTS_CHUNK_CHARS,
+               first_length: Optional[int] = None) -> List[str]:
+    """Split text into chunks of up to max_length characters at sentence boundaries
+
+    first_length caps the first chunk separately, so a stream can start playing
+    after one short chunk.
+    """
+    chunks = []
+    current_chunk = ""
+
+    for sentence in _SENTENCE_END_RE.split(text.strip()):
+        limit = first_length if first_length and not chunks else max_length
+        if current_chunk and len(current_chunk) + len(sentence) + 1 > limit:
+            chunks.append(current_chunk)
+            current_chunk = sentence
+        else:
+            current_chunk = f"{current_chunk} {sentence}" if current_chunk else sentence
+
+    if current_chunk:
+        chunks.append(current_chunk)
+
+    return chunks
+
+
+def synthesize_chunk(text: str, language: str, tld: str = "com", slow: bool = False,
+                     engine: Optional[str] = None) -> Tuple[bytes, str]:
+    """Synthesize one chunk into memory, failing over to TTS_FALLBACK_ENGINE
+
+    Returns the audio and the name of the engine that produced it.
+    """
+    primary = get_synthesizer(engine)
+    try:
+        return primary.synthesize(text, language, tld, slow), primary.name
+    except Exception as e:
+        fallback = SYNTHESIZERS.get(Config.TTS_FALLBACK_ENGINE.lower())
+        if fallback is None or fallback is primary or not fallback.available():
+            raise
+        print(f"{primary.name} TTS failed ({e}) - falling back to {fallback.name}")
+        return fallback.synthesize(text, language, tld, slow), fallback.name
+
+
+def _engine_used(results: List[Tuple[bytes, str]], engine: str) -> str:
+    """The requested engine if it produced every chunk, else the fallback that stepped in"""
+    return next((used for _, used in results if used != engine), engine)
+
+
+def synthesize_mp3(text: str, language: str, tld: str = "com", slow: bool = False,
+                   max_chunk_chars: int = Config.TTS_CHUNK_CHARS,
+                   engine: Optional[str] = None) -> Tuple[bytes, str]:
+    """Synthesize a script as one MP3, with its chunks generated in parallel
+
+    Returns the audio and the engine that produced it. Blocks until done, so
+    call it off the event loop and never from a tts_executor thread (it waits
+    on that pool).
+    """
+    engine = get_synthesizer(engine).name
+    chunks = split_text(text, max_chunk_chars)
+    if len(chunks) <= 1:
+        return synthesize_chunk(text, language, tld, slow, engine)
+
+    # map() yields results in submission order, so the audio stays in script order
+    results = list(tts_executor.map(lambda chunk: synthesize_chunk(chunk, language, tld, slow, engine), chunks))
+    return concat_mp3(audio for audio, _ in results), _engine_used(results, engine)
+
+
+def render_briefing(segments: List[str], language: str, tld: str = "com", slow: bool = False,
+                    engine: Optional[str] = None) -> Tuple[bytes, str, List[Tuple[str, bytes, str]]]:
+    """Assemble a briefing in memory, like synthesize_briefing, without writing anything
+
+    Also returns (segment, audio, engine) for every segment that had to be
+    synthesized, so the caller can persist them later (or not at all).
+    """
+    engine = get_synthesizer(engine).name
+    audio: List[Optional[bytes]] = [None] * len(segments)
+    used = engine
+    fresh = []
+    pending = {}
+
+    for index, segment in enumerate(segments):
+        audio[index] = audio_cache.read(segment, language, tld, slow, engine)
+        if audio[index] is None:
+            # Chunks of every changed segment share the pool at once
+            pending[index] = [tts_executor.submit(synthesize_chunk, chunk, language, tld, slow, engine)
+                              for chunk in split_text(segment)]
+
+    try:
+        for index, futures in pending.items():
+            results = [future.result() for future in futures]
+            audio[index] = concat_mp3(part for part, _ in results)
+            segment_engine = _engine_used(results, engine)
+            fresh.append((segments[index], audio[index], segment_engine))
+            if segment_engine != engine:
+                used = segment_engine
+    finally:
+        for futures in pending.values():
+            for future in futures:
+                future.cancel()
+
+    return concat_mp3(audio), used, fresh
+
+
+def store_segments(fresh: List[Tuple[str, bytes, str]], language: str, tld: str = "com", slow: bool = False):
+    """Save segments returned by render_briefing to the audio cache"""
+    for segment, audio, engine in fresh:
+        # Failover audio is filed under the engine that made it, so the
+        # requested engine gets another try next time
+        audio_cache.store(segment, language, audio, tld, slow, engine)
+
+
+def synthesize_briefing(segments: List[str], language: str, tld: str = "com", slow: bool = False,
+                        engine: Optional[str] = None) -> Tuple[bytes, str]:
+    """Assemble a briefing from per-segment MP3s, synthesizing only segments not cached yet
+
+    Changing one topic out of five re-synthesizes that topic's segment; the
+    intro, outro and other topics are spliced in from the audio cache.
+    """
+    audio, used, fresh = render_briefing(segments, language, tld, slow, engine)
+    store_segments(fresh, language, tld, slow)
+    return audio, used
+
+
+async def stream_briefing(segments: List[str], language: str, tld: str = "com", slow: bool = False,
+                          first_chunk_chars: int = Config.TTS_FIRST_CHUNK_CHARS,
+                          engine: Optional[str] = None, script: Optional[str] = None) -> AsyncIterator[bytes]:
+    """Yield a briefing's MP3 frames in order, as soon as each part is available
+
+    Cached segments are sent straight from disk. Chunks of the other segments
+    are all queued at once and synthesized in parallel; the very first chunk is
+    short, so playback can start while the rest are still being generated.
+    Given the full script, a completely streamed briefing is also stored under
+    it, filed under the engine that produced it.
+    """
+    engine = get_synthesizer(engine).name
+    used = engine
+    sent = []
+    plan = []
+    for index, segment in enumerate(segments):
+        # Read now, so a segment evicted mid-stream can't leave a gap
+        cached = await asyncio.to_thread(audio_cache.read, segment, language, tld, slow, engine)
+        if cached is not None:
+            plan.append((segment, cached, []))
+        else:
+            chunks = split_text(segment, first_length=first_chunk_chars if index == 0 else None)
+            plan.append((segment, None, [tts_executor.submit(synthesize_chunk, chunk, language, tld, slow, engine)
+                                         for chunk in chunks]))
+
+    try:
+        for segment, cached, futures in plan:
+            if cached is not None:
+                sent.append(audio_frames(cached))
+                yield sent[-1]
+                continue
+
+            results = []
+            for future in futures:
+                part, part_engine = await asyncio.wrap_future(future)
+                results.append((audio_frames(part), part_engine))
+                sent.append(results[-1][0])
+                yield sent[-1]
+            segment_engine = _engine_used(results, engine)
+            await asyncio.to_thread(audio_cache.store, segment, language, b"".join(part for part, _ in results),
+                                    tld, slow, segment_engine)
+            if segment_engine != engine:
+                used = segment_engine
+
+        if script is not None:
+            # Fully streamed: a repeat is served as one file, at a stable /audio URL
+            await asyncio.to_thread(audio_cache.store, script, language, b"".join(sent), tld, slow, used)
+    finally:
+        # Client went away or a chunk failed: drop the chunks that haven't started
+        for _, _, futures in plan:
+            for future in futures:
+                future.cancel()
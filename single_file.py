@@ -3,11 +3,13 @@ import os
 import sys
 import time
 import json
-import re
 from datetime import datetime
 import io
 import subprocess
 from urllib.parse import quote_plus
+from config import Config
+from services.rate_limiter import rate_limiter
+from services.topic_service import canonical_topic
 
 # Page config
 st.set_page_config(
@@ -30,9 +32,9 @@ def install_missing_packages():
         packages_to_install.append('feedparser')
     
     try:
-        import requests
+        import httpx
     except ImportError:
-        packages_to_install.append('requests')
+        packages_to_install.append('httpx')
     
     try:
         from gtts import gTTS
@@ -72,17 +74,17 @@ if 'packages_installed' not in st.session_state:
 
 # Now import after installation
 try:
-    import feedparser
-    import requests
-    from gtts import gTTS
     from groq import Groq
+    from services.http_client import get_client, http_get
+    from services.feed_service import fetch_feed_entries_sync, normalize_headlines
+    from services.tts_service import synthesize_mp3
     IMPORTS_SUCCESSFUL = True
 except ImportError as e:
     st.error(f"Import failed: {e}")
     st.error("Please add the following to your requirements.txt or Pipfile:")
     st.code("""
 feedparser
-requests
+httpx
 gtts
 groq
     """)
@@ -199,6 +201,9 @@ VOICE_OPTIONS = {
     'female': '👩 Female Style (Higher/Faster)'
 }
 
+# Groq endpoint, used to pick the rate limit bucket for completions
+GROQ_API_URL = f"{Config.GROQ_BASE_URL}/openai/v1/chat/completions"
+
 # Initialize Groq client
 @st.cache_resource
 def get_groq_client():
@@ -217,7 +222,8 @@ def get_groq_client():
         if not api_key:
             return None
             
-        return Groq(api_key=api_key)
+        # Reuse the shared connection pool instead of a private one
+        return Groq(api_key=api_key, base_url=Config.GROQ_BASE_URL, http_client=get_client())
     except Exception as e:
         st.warning(f"⚠️ Could not initialize Groq client: {e}")
         return None
@@ -225,14 +231,11 @@ def get_groq_client():
 def scrape_news_advanced(keyword: str) -> str:
     """Enhanced news scraping with AI summarization"""
     try:
-        url = f"https://news.google.com/rss/search?q={quote_plus(keyword)}&hl=en-US&gl=US&ceid=US:en"
+        url = f"{Config.GOOGLE_NEWS_RSS_URL}?q={quote_plus(canonical_topic(keyword))}&hl=en-US&gl=US&ceid=US:en"
         headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
         
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        feed = feedparser.parse(response.content)
-        headlines = [re.sub(r'<[^>]+>', '', entry.title) for entry in feed.entries[:8]]
+        entries = fetch_feed_entries_sync(url, headers=headers, timeout=10, limit=8)
+        headlines = normalize_headlines(entries)
         
         return create_ai_summary(headlines, keyword) if headlines else f"No recent news found for {keyword}"
     except Exception as e:
@@ -247,6 +250,7 @@ def create_ai_summary(headlines: list, topic: str) -> str:
             
         headlines_text = "\n".join(headlines)
         
+        rate_limiter.acquire_sync(GROQ_API_URL)
         response = client.chat.completions.create(
             model="llama3-70b-8192",
             messages=[{
@@ -264,10 +268,10 @@ def create_ai_summary(headlines: list, topic: str) -> str:
 def scrape_reddit_advanced(topic: str) -> str:
     """Enhanced Reddit analysis"""
     try:
-        url = f"https://www.reddit.com/search.json?q={quote_plus(topic)}&sort=hot&limit=10&t=week"
+        url = f"{Config.REDDIT_SEARCH_URL}?q={quote_plus(canonical_topic(topic))}&sort=hot&limit=10&t=week"
         headers = {'User-Agent': 'NewsNinja/2.0 (Educational)'}
         
-        response = requests.get(url, headers=headers, timeout=10)
+        response = http_get(url, headers=headers, timeout=10)
         data = response.json()
         
         posts = data.get('data', {}).get('children', [])
@@ -336,6 +340,7 @@ def generate_professional_script(results: list, language: str = "en", voice_gend
         
         content_text = "\n".join(content)
         
+        rate_limiter.acquire_sync(GROQ_API_URL)
         response = client.chat.completions.create(
             model="llama3-70b-8192",
             messages=[{
@@ -408,8 +413,8 @@ def generate_professional_audio(script: str, language: str = "en", voice_gender:
         st.error(f"Audio generation failed: {e}")
         return None
 
-def generate_gtts_audio(script: str, language: str, voice_gender: str) -> io.BytesIO:
-    """Enhanced gTTS with gender-specific modifications"""
+def generate_gtts_audio(script: str, language: str, voice_gender: str, engine: str = None) -> io.BytesIO:
+    """Enhanced gTTS with gender-specific modifications (TTS_ENGINE, with failover, does the synthesis)"""
     try:
         # Get language and voice settings
         lang_config = LANGUAGES.get(language, LANGUAGES['en'])
@@ -422,20 +427,17 @@ def generate_gtts_audio(script: str, language: str, voice_gender: str) -> io.Byt
             script = script.replace('everyone', 'folks')
             
             # Use gTTS with slower speed and different accent for male perception
-            tts = gTTS(text=script, lang=voice_config['lang'], tld=voice_config['tld'], slow=True)
+            slow = True
         else:
             # Process for higher, faster female voice simulation  
             script = script.replace('good morning', 'hello')
             script = script.replace('folks', 'everyone')
             
             # Use gTTS with normal speed and different accent for female perception
-            tts = gTTS(text=script, lang=voice_config['lang'], tld=voice_config['tld'], slow=False)
-        
-        fp = io.BytesIO()
-        tts.write_to_fp(fp)
-        fp.seek(0)
+            slow = False
         
-        return fp
+        audio, _ = synthesize_mp3(script, voice_config['lang'], tld=voice_config['tld'], slow=slow, engine=engine)
+        return io.BytesIO(audio)
         
     except Exception as e:
         raise Exception(f"gTTS generation failed: {e}")
@@ -601,7 +603,6 @@ def analyze_topics_pro(source_type, language, voice_gender):
             })
             
             progress_bar.progress((i + 1) / len(st.session_state.topics))
-            time.sleep(0.5)  # Rate limiting
         
         st.session_state.last_analysis = results
         st.session_state.voice_gender = voice_gender  # Store voice preference
@@ -1,15 +1,16 @@
 import streamlit as st
-import requests
 from urllib.parse import quote_plus
-import feedparser
 from gtts import gTTS
 from datetime import datetime
 import io
-import time
 import asyncio
 from typing import List, Dict
 import json
 import re
+from config import Config
+from services.http_client import http_get
+from services.feed_service import fetch_feed_entries_sync, normalize_headlines
+from services.topic_service import canonical_topic
 
 # Page config
 st.set_page_config(
@@ -59,22 +60,15 @@ LANGUAGES = {
 def scrape_news_advanced(keyword: str) -> str:
     """Advanced news scraping with better parsing"""
     try:
-        url = f"https://news.google.com/rss/search?q={quote_plus(keyword)}&hl=en-US&gl=US&ceid=US:en"
+        url = f"{Config.GOOGLE_NEWS_RSS_URL}?q={quote_plus(canonical_topic(keyword))}&hl=en-US&gl=US&ceid=US:en"
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
         
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        # Parse RSS feed
-        feed = feedparser.parse(response.content)
-        headlines = []
-        
-        for entry in feed.entries[:8]:
-            # Clean HTML from title
-            title = re.sub(r'<[^>]+>', '', entry.title)
-            headlines.append(title)
+        # Only the first 8 items are parsed
+        entries = fetch_feed_entries_sync(url, headers=headers, timeout=10, limit=8)
+        # Strip HTML, unescape entities and drop publisher suffixes
+        headlines = normalize_headlines(entries)
             
         if headlines:
             return create_smart_summary(headlines, keyword)
@@ -110,10 +104,10 @@ def create_smart_summary(headlines: List[str], topic: str) -> str:
 def scrape_reddit_advanced(topic: str) -> str:
     """Advanced Reddit analysis with engagement metrics"""
     try:
-        url = f"https://www.reddit.com/search.json?q={quote_plus(topic)}&sort=hot&limit=10&t=week"
+        url = f"{Config.REDDIT_SEARCH_URL}?q={quote_plus(canonical_topic(topic))}&sort=hot&limit=10&t=week"
         headers = {'User-Agent': 'NewsNinja/2.0 (Educational)'}
         
-        response = requests.get(url, headers=headers, timeout=10)
+        response = http_get(url, headers=headers, timeout=10)
         data = response.json()
         
         posts = data.get('data', {}).get('children', [])
@@ -325,7 +319,6 @@ def analyze_topics_comprehensive(source_type, language):
                 news_summary = scrape_news_advanced(topic)
                 current_step += 1
                 progress_bar.progress(current_step / total_steps)
-                time.sleep(1)  # Rate limiting
             
             # Reddit analysis
             if source_type in ["reddit", "both"]:
@@ -333,7 +326,6 @@ def analyze_topics_comprehensive(source_type, language):
                 reddit_summary = scrape_reddit_advanced(topic)
                 current_step += 1
                 progress_bar.progress(current_step / total_steps)
-                time.sleep(1)  # Rate limiting
                 
             # Sentiment analysis
             sentiment = analyze_sentiment_advanced(news_summary, reddit_summary)
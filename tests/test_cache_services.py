@@ -0,0 +1,97 @@
+import asyncio
+import time
+
+from services.cache_services import CacheService, script_cache_key
+
+
+SOFT_TTL = 0.05
+
+
+def _make_cache(tmp_path):
+    """A cache whose entries go stale after SOFT_TTL seconds, in memory and in SQLite alike"""
+    cache = CacheService(cache_path=str(tmp_path / "cache.db"), l1_ttl_seconds=60)
+    cache.soft_ttl = SOFT_TTL
+    return cache
+
+
+def _wait_until_stale():
+    time.sleep(SOFT_TTL * 1.5)
+
+
+def test_script_cache_key_keeps_topic_lists_apart():
+    assert script_cache_key(["space", "exploration"], "both", "en") != \
+        script_cache_key(["space exploration"], "both", "en")
+    assert script_cache_key(["Space  Exploration"], "both", "en") == \
+        script_cache_key(["space exploration"], "both", "en")
+
+
+def test_stale_entry_is_served_while_refreshing(tmp_path):
+    async def scenario():
+        cache = _make_cache(tmp_path)
+        version = {"value": 1}
+
+        async def load():
+            return {"value": version["value"]}
+
+        assert await cache.get_or_refresh("news:x", load) == {"value": 1}
+        _wait_until_stale()
+        version["value"] = 2
+
+        assert await cache.get_or_refresh("news:x", load) == {"value": 1}
+        await asyncio.gather(*cache.refresh_tasks)
+        assert cache.get("news:x") == {"value": 2}
+
+    asyncio.run(scenario())
+
+
+def test_refresh_adopts_value_another_worker_stored(tmp_path):
+    async def scenario():
+        worker_a = _make_cache(tmp_path)
+        worker_b = _make_cache(tmp_path)
+        loads = []
+
+        async def load():
+            loads.append(1)
+            return {"value": "upstream"}
+
+        worker_a.set("news:x", {"value": "old"})
+        assert await worker_a.get_or_refresh("news:x", load) == {"value": "old"}
+        _wait_until_stale()
+        # Meanwhile the other worker refreshed the shared tier
+        worker_b.set("news:x", {"value": "new"})
+
+        assert await worker_a.get_or_refresh("news:x", load) == {"value": "old"}
+        await asyncio.gather(*worker_a.refresh_tasks)
+
+        assert worker_a.get("news:x") == {"value": "new"}
+        assert loads == []
+
+    asyncio.run(scenario())
+
+
+def test_refresh_reloads_stale_child_stages(tmp_path):
+    async def scenario():
+        cache = _make_cache(tmp_path)
+        version = {"news": 1}
+
+        async def load_news():
+            return {"summary": f"news-v{version['news']}"}
+
+        async def load_script():
+            news = await cache.get_or_refresh("news:x", load_news)
+            return {"script": f"script({news['summary']})"}
+
+        assert await cache.get_or_refresh("seg:x", load_script) == {"script": "script(news-v1)"}
+        # Both stages were written together, so they go stale together
+        _wait_until_stale()
+        version["news"] = 2
+
+        # The request is still answered from the stale script...
+        assert await cache.get_or_refresh("seg:x", load_script) == {"script": "script(news-v1)"}
+        await asyncio.gather(*cache.refresh_tasks)
+
+        # ...but the refresh rebuilds it from the new summary, not the stale one
+        assert cache.get("news:x") == {"summary": "news-v2"}
+        assert cache.get("seg:x") == {"script": "script(news-v2)"}
+
+    asyncio.run(scenario())
@@ -1,14 +1,18 @@
 from urllib.parse import quote_plus
 from dotenv import load_dotenv
-import requests
 import os
 from fastapi import FastAPI, HTTPException
 from bs4 import BeautifulSoup
-from datetime import datetime
 from pathlib import Path
-from gtts import gTTS
-import feedparser
+import threading
 import time
+from config import Config
+from services.http_client import fetch_post
+from services.feed_service import fetch_feed_entries, normalize_headlines
+from services.audio_cache import audio_cache
+from services.topic_service import canonical_topic
+from services.tts_service import render_briefing, store_segments, synthesize_briefing, synthesize_mp3
+from services.synthesizers import get_synthesizer
 
 load_dotenv()
 
@@ -16,12 +20,16 @@ class MCPOverloadedError(Exception):
     """Custom exception for MCP service overloads"""
     pass
 
+# Locale of the Google News edition we query; part of fetch/coalescing keys
+NEWS_LOCALE = "en-US"
+
 def generate_valid_news_url(keyword: str) -> str:
     """Generate a Google News RSS URL for a keyword"""
-    q = quote_plus(keyword)
-    return f"https://news.google.com/rss/search?q={q}&hl=en-US&gl=US&ceid=US:en"
+    # Spelling variants of a topic share one feed URL (and its ETag)
+    q = quote_plus(canonical_topic(keyword))
+    return f"{Config.GOOGLE_NEWS_RSS_URL}?q={q}&hl=en-US&gl=US&ceid=US:en"
 
-def scrape_news_free(keyword: str) -> str:
+async def scrape_news_free(keyword: str) -> str:
     """Scrape news using free Google News RSS"""
     try:
         url = generate_valid_news_url(keyword)
@@ -29,27 +37,24 @@ def scrape_news_free(keyword: str) -> str:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
         
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        # Parse RSS feed
-        feed = feedparser.parse(response.content)
-        headlines = []
-        
-        for entry in feed.entries[:10]:  # Get top 10 headlines
-            headlines.append(entry.title)
+        # Revalidates with ETag/Last-Modified and reuses parsed entries on 304
+        # Get top 10 headlines
+        entries = await fetch_feed_entries(url, headers=headers, timeout=10, limit=10)
+        headlines = normalize_headlines(entries)
             
         return "\n".join(headlines)
         
     except Exception as e:
         return f"Error fetching news for {keyword}: {str(e)}"
 
-def summarize_with_free_api(headlines: str) -> str:
+async def summarize_with_free_api(headlines: str) -> str:
     """Summarize using free Hugging Face API"""
     try:
         # Using free Hugging Face Inference API
-        api_url = "https://api-inference.huggingface.co/models/facebook/bart-large-cnn"
-        headers = {"Authorization": f"Bearer {os.getenv('HUGGINGFACE_API_KEY', '')}"}
+        api_url = Config.HUGGINGFACE_API_URL
+        api_key = os.getenv('HUGGINGFACE_API_KEY', '')
+        # An empty "Bearer " value is an illegal header for httpx
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
         
         # Truncate if too long
         max_length = 1000
@@ -58,7 +63,7 @@ def summarize_with_free_api(headlines: str) -> str:
             
         payload = {"inputs": headlines}
         
-        response = requests.post(api_url, headers=headers, json=payload, timeout=30)
+        response = await fetch_post(api_url, headers=headers, json=payload, timeout=30)
         
         if response.status_code == 200:
             result = response.json()
@@ -88,32 +93,34 @@ def create_simple_summary(headlines: str) -> str:
     summary += "That concludes our news summary."
     return summary
 
-def generate_broadcast_news(api_key, news_data, reddit_data, topics):
-    """Generate broadcast news using available data"""
-    try:
-        broadcast_segments = []
+def generate_broadcast_segments(news_data, reddit_data, topics) -> list:
+    """Broadcast script as separately synthesizable parts: one per topic, then the outro"""
+    broadcast_segments = []
+        
+    for topic in topics:
+        news_content = news_data.get("news_analysis", {}).get(topic, '') if news_data else ''
+        reddit_content = reddit_data.get("reddit_analysis", {}).get(topic, '') if reddit_data else ''
+        
+        segment = f"Now reporting on {topic}. "
         
-        for topic in topics:
-            news_content = news_data.get("news_analysis", {}).get(topic, '') if news_data else ''
-            reddit_content = reddit_data.get("reddit_analysis", {}).get(topic, '') if reddit_data else ''
+        if news_content and not news_content.startswith("Error"):
+            segment += f"According to recent reports, {news_content} "
             
-            segment = f"Now reporting on {topic}. "
+        if reddit_content and not reddit_content.startswith("Error"):
+            segment += f"Meanwhile, online discussions reveal {reddit_content} "
             
-            if news_content and not news_content.startswith("Error"):
-                segment += f"According to recent reports, {news_content} "
-                
-            if reddit_content and not reddit_content.startswith("Error"):
-                segment += f"Meanwhile, online discussions reveal {reddit_content} "
-                
-            if not news_content and not reddit_content:
-                segment += f"No recent updates available for this topic. "
-                
-            broadcast_segments.append(segment)
+        if not news_content and not reddit_content:
+            segment += f"No recent updates available for this topic. "
             
-        final_script = " ".join(broadcast_segments)
-        final_script += " This concludes our news update."
-        
-        return final_script
+        broadcast_segments.append(segment)
+
+    broadcast_segments.append("This concludes our news update.")
+    return broadcast_segments
+
+def generate_broadcast_news(api_key, news_data, reddit_data, topics):
+    """Generate broadcast news using available data"""
+    try:
+        return " ".join(generate_broadcast_segments(news_data, reddit_data, topics))
         
     except Exception as e:
         return f"Error generating broadcast: {str(e)}"
@@ -121,34 +128,96 @@ def generate_broadcast_news(api_key, news_data, reddit_data, topics):
 AUDIO_DIR = Path("audio")
 AUDIO_DIR.mkdir(exist_ok=True)
 
-def tts_to_audio(text: str, language: str = 'en') -> str:
-    """Convert text to speech using gTTS with language support"""
+def tts_to_audio(text: str, language: str = 'en', tld: str = 'com', slow: bool = False,
+                 segments: list = None, engine: str = None) -> str:
+    """Convert text to speech using gTTS (or another TTS engine) with language support
+
+    Given the script's segments, only segments missing from the audio cache are synthesized.
+    """
+    engine = get_synthesizer(engine).name
+
+    def synthesize(lang):
+        def write(path):
+            if segments:
+                audio, used = synthesize_briefing(segments, lang, tld, slow, engine)
+            else:
+                audio, used = synthesize_mp3(text, lang, tld, slow, engine=engine)
+            Path(path).write_bytes(audio)
+            return used
+        return write
+
     try:
         # Validate language - fallback to English if unsupported
-        supported_languages = ['en', 'es', 'fr', 'de', 'it', 'pt', 'ru', 'ja', 'ko', 'zh', 'hi', 'ar']
-        if language not in supported_languages:
+        if language not in Config.SUPPORTED_LANGUAGES:
             language = 'en'
-            
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = AUDIO_DIR / f"tts_{language}_{timestamp}.mp3"
-        
-        # Create TTS object and save
-        tts = gTTS(text=text, lang=language, slow=False)
-        tts.save(str(filename))
-        
-        return str(filename)
+
+        # Identical scripts reuse the MP3 synthesized earlier instead of calling the engine
+        return audio_cache.get_or_create(
+            text, language, synthesize(language), tld=tld, slow=slow, engine=engine
+        )
     except Exception as e:
-        print(f"gTTS Error: {str(e)}")
+        print(f"TTS Error: {str(e)}")
         # Fallback to English if language fails
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = AUDIO_DIR / f"tts_en_{timestamp}.mp3"
-            tts = gTTS(text=text, lang='en', slow=False)
-            tts.save(str(filename))
-            return str(filename)
+            return audio_cache.get_or_create(
+                text, 'en', synthesize('en'), tld=tld, slow=slow, engine=engine
+            )
         except:
             return None
 
+def tts_to_bytes(text: str, language: str = 'en', tld: str = 'com', slow: bool = False,
+                 segments: list = None, engine: str = None):
+    """Like tts_to_audio, but the MP3 stays in memory
+
+    Returns (audio, persist, path). On a cache hit audio and persist are None
+    and path is the cached file, to be sent as is. Otherwise persist() saves
+    the new audio to the audio cache: run it after the response is sent, or
+    skip it to keep the disk out entirely. Calling it again is a no-op, so
+    callers sharing one result can each schedule it.
+    """
+    engine = get_synthesizer(engine).name
+    if language not in Config.SUPPORTED_LANGUAGES:
+        language = 'en'
+
+    def synthesize(lang):
+        cached = audio_cache.cached(text, lang, tld, slow, engine)
+        if cached:
+            # Served from disk by the caller, not copied into memory
+            return None, None, cached
+
+        if segments:
+            audio, used, fresh = render_briefing(segments, lang, tld, slow, engine)
+        else:
+            audio, used = synthesize_mp3(text, lang, tld, slow, engine=engine)
+            fresh = []
+
+        persist_lock = threading.Lock()
+        persisted = []
+
+        def persist():
+            with persist_lock:
+                if persisted:
+                    return
+                persisted.append(True)
+            try:
+                store_segments(fresh, lang, tld, slow)
+                audio_cache.store(text, lang, audio, tld, slow, used)
+            except Exception as e:
+                print(f"Audio persist error: {e}")
+        return audio, persist, None
+
+    try:
+        return synthesize(language)
+    except Exception as e:
+        print(f"TTS Error: {str(e)}")
+        if language == 'en':
+            return None, None, None
+        # Fallback to English if language fails
+        try:
+            return synthesize('en')
+        except Exception:
+            return None, None, None
+
 # Keep the original ElevenLabs function as fallback but make it optional
 def text_to_audio_elevenlabs_sdk(text: str, **kwargs) -> str:
     """Fallback to gTTS if ElevenLabs not available"""